@@ -30,11 +30,70 @@ Output:
 Use verify [file] to test your solution and see how it does. When you are finished editing your code, use submit [file] to submit your answer. If your solution passes the test cases, it will be removed from your home folder.
 '''
 
+from collections import Counter, deque
+import math
+from number_input import format_decimal, iter_numbers
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+'''
+Multiplying millions of numbers left to right is quadratic: every step multiplies a huge product by a small number.
+A product tree multiplies neighbours pairwise, then the pairs pairwise, and so on,
+so both sides of every multiplication have about the same size and the big ones are few.
+
+For a stream, the same shape is kept with a stack of partial products, like a binary counter:
+a product is merged into the one below it as soon as it has as many factors. 
+The stack never holds more than about log2(n) products.
+'''
+
+# Readings taken at once from a NumPy array
+CHUNK_SIZE = 1 << 16
+
+def product_tree (nums):
+    products = list(nums)
+    if not products:
+        return 1
+    while len(products) > 1:
+        paired = [ products[i] * products[i + 1] for i in range(0, len(products) - 1, 2) ]
+        if len(products) % 2 == 1:
+            paired.append(products[-1])
+        products = paired
+    return products[0]
+
+def push_product (stack, x, size=1):
+    '''
+    Add x, a product of size factors, to a stack of [# of factors, product] pairs
+    '''
+    stack.append([size, x])
+    while len(stack) > 1 and stack[-2][0] <= stack[-1][0]:
+        size, product = stack.pop()
+        stack[-1][0] += size
+        stack[-1][1] *= product
+
+def stack_product (stack):
+    # Smallest products are at the top
+    return product_tree(product for _, product in reversed(stack))
+
 def multiply_list (nums):
-    product = 1
+    stack = []
     for i in nums:
-        product = product * i
-    return product
+        push_product(stack, i)
+    return stack_product(stack)
+
+def multiply_parallel (nums, workers=None, chunksize=1 << 16):
+    '''
+    multiply_list() with the chunks multiplied in a process pool. Only the top of the tree is done here.
+    '''
+    from concurrent.futures import ProcessPoolExecutor
+
+    nums = list(nums)
+    if len(nums) <= chunksize:
+        return product_tree(nums)
+    chunks = [ nums[i:i + chunksize] for i in range(0, len(nums), chunksize) ]
+    with ProcessPoolExecutor(workers) as pool:
+        return product_tree(pool.map(product_tree, chunks))
 
 def answer(xs):
     # Separate negatives and positives
@@ -72,8 +131,268 @@ def answer(xs):
                 return str(removed)
     elif len(positives) == 0:
         # No positive but > 1 negative
-        return str(max(neg_product))
+        # neg_product is already positive, there's nothing to take the max of
+        return str(neg_product)
     else:
         # >= 1 positive and >1 neg.
         # don't include the removed neg
         return str(neg_product * multiply_list(positives))
+
+'''
+Streaming
+
+answer() keeps the positives and negatives in lists and sorts the negatives, just to find one number: 
+the negative closest to zero, which is the one to leave out when there's an odd number of negatives.
+With millions of panels, one pass is enough if we keep:
+    - the product of every non-zero panel
+    - how many non-zero and negative panels there are
+    - the negative closest to zero
+    - whether there was a 0
+At the end, an odd number of negatives means dividing that negative back out of the product. 
+The only cases left are when nothing is left after that:
+    - a single negative panel and nothing else: that's the answer
+    - a single negative panel and some 0's: 0
+    - only 0's: 0
+'''
+
+def scan_panels (xs):
+    '''
+    One pass over xs (any iterable of ints, or a NumPy int array)
+    Returns (product of the non-zero panels, # of non-zero, # of negatives, negative closest to 0, has a 0)
+    A NumPy array (memory-mapped ones too) is read CHUNK_SIZE readings at a time, 
+    and each chunk goes on the product stack as a single product.
+    '''
+    if np is not None and isinstance(xs, np.ndarray):
+        xs = xs.ravel()
+        if len(xs) == 0:
+            raise ValueError('No panels')
+        stack = []
+        nonzero = 0
+        negatives = 0
+        largest_negative = None
+        for start in range(0, len(xs), CHUNK_SIZE):
+            chunk = xs[start:start + CHUNK_SIZE]
+            chunk = chunk[chunk != 0]
+            if len(chunk) == 0:
+                continue
+            push_product(stack, product_tree(chunk.tolist()), len(chunk))
+            nonzero += len(chunk)
+            chunk = chunk[chunk < 0]
+            if len(chunk):
+                negatives += len(chunk)
+                largest = int(chunk.max())
+                if largest_negative is None or largest > largest_negative:
+                    largest_negative = largest
+        return stack_product(stack), nonzero, negatives, largest_negative, nonzero < len(xs)
+
+    stack = []
+    nonzero = 0
+    negatives = 0
+    largest_negative = None
+    has_zero = False
+    for x in xs:
+        if x == 0:
+            has_zero = True
+            continue
+        push_product(stack, x)
+        nonzero += 1
+        if x < 0:
+            negatives += 1
+            if largest_negative is None or x > largest_negative:
+                largest_negative = x
+
+    if nonzero == 0 and not has_zero:
+        raise ValueError('No panels')
+    return stack_product(stack), nonzero, negatives, largest_negative, has_zero
+
+def max_product (xs):
+    '''
+    The maximum product of a non-empty subset of xs, as an int
+    '''
+    product, nonzero, negatives, largest_negative, has_zero = scan_panels(xs)
+
+    if negatives % 2 == 1:
+        if nonzero == 1:
+            # The only non-zero panel is negative
+            return 0 if has_zero else largest_negative
+        return product // largest_negative
+
+    if nonzero == 0:
+        return 0
+    return product
+
+def answer_stream (xs):
+    # str() of a product with millions of digits is quadratic, and refused past 4300 digits
+    return format_decimal(max_product(xs))
+
+def answer_file (path):
+    '''
+    answer() for a file of panel readings, one per line, read through a memory map
+    '''
+    return answer_stream(iter_numbers(path))
+
+'''
+Factored answers
+
+The exact answer for a big array has millions of digits, and most of the time it's only needed to compare arrays.
+Panel readings repeat a lot, so the chosen panels are better kept as {value: exponent},
+with the log10 of the answer next to it. The exact value can still be built from it later:
+every v ** e is a fast power, and the powers are multiplied in a product tree.
+The log10 of 0 is -inf, so a 0 answer still compares below everything else.
+'''
+
+def log10_factored (factors):
+    if 0 in factors:
+        return float('-inf')
+    return sum(e * math.log10(abs(v)) for v, e in factors.items())
+
+def factored_value (factors):
+    return product_tree(v ** e for v, e in sorted(factors.items()))
+
+def max_product_factored (xs):
+    '''
+    The panels of the maximum product, as (Counter of value: exponent, log10 of the absolute value of the product)
+    The answer is 0 exactly when the Counter is {0: 1}.
+    '''
+    if np is not None and isinstance(xs, np.ndarray):
+        values, counts = np.unique(xs, return_counts=True)
+        factors = Counter(dict(zip(values.tolist(), counts.tolist())))
+    else:
+        factors = Counter(xs)
+    if not factors:
+        raise ValueError('No panels')
+
+    has_zero = factors.pop(0, 0) > 0
+    negatives = [ v for v in factors if v < 0 ]
+    if sum(factors[v] for v in negatives) % 2 == 1:
+        largest_negative = max(negatives)
+        if sum(factors.values()) == 1:
+            # The only non-zero panel is negative
+            if not has_zero:
+                return factors, log10_factored(factors)
+            factors = Counter()
+        else:
+            factors[largest_negative] -= 1
+            if factors[largest_negative] == 0:
+                del factors[largest_negative]
+
+    if not factors:
+        factors = Counter({0: 1})
+    return factors, log10_factored(factors)
+
+'''
+Sliding window
+
+To follow the answer over the last W readings, re-running answer() on every window costs O(W) per reading.
+Everything max_product() needs can be updated when a reading comes in or goes out:
+    - the # of zeros, negatives and non-zero readings
+    - the readings themselves as a Counter, which is the factored product, and the sum of their log10's
+    - the negative closest to 0, with a monotonic deque:
+      it holds (index, value) of the negatives that can still become the largest one,
+      in decreasing order of value. A new negative removes every smaller one from the back,
+      since they leave the window before it. The front is the largest, and is dropped when its reading leaves.
+Each reading goes in and out of the deque once, so push() and pop() are amortized O(1).
+The exact product is only built by value().
+'''
+
+class SlidingMaxProduct(object):
+    def __init__ (self, size):
+        if size < 1:
+            raise ValueError('The window needs at least 1 reading')
+        self.size = size
+        self.window = deque()
+        self.largest_negatives = deque()
+        self.factors = Counter()
+        self.log_sum = 0.0
+        self.zeros = 0
+        self.negatives = 0
+        self.pushed = 0
+
+    def __len__ (self):
+        return len(self.window)
+
+    def push (self, x):
+        '''
+        Add the newest reading, dropping the oldest one if the window is full
+        '''
+        if len(self.window) == self.size:
+            self.pop()
+        self.window.append(x)
+        if x == 0:
+            self.zeros += 1
+        else:
+            self.factors[x] += 1
+            self.log_sum += math.log10(abs(x))
+            if x < 0:
+                self.negatives += 1
+                while self.largest_negatives and self.largest_negatives[-1][1] <= x:
+                    self.largest_negatives.pop()
+                self.largest_negatives.append((self.pushed, x))
+        self.pushed += 1
+
+    def pop (self):
+        '''
+        Drop the oldest reading, and return it
+        '''
+        if not self.window:
+            raise IndexError('pop from an empty window')
+        index = self.pushed - len(self.window)
+        x = self.window.popleft()
+        if x == 0:
+            self.zeros -= 1
+        else:
+            self.factors[x] -= 1
+            if self.factors[x] == 0:
+                del self.factors[x]
+            if self.factors:
+                self.log_sum -= math.log10(abs(x))
+            else:
+                # Don't let rounding errors pile up
+                self.log_sum = 0.0
+            if x < 0:
+                self.negatives -= 1
+                if self.largest_negatives[0][0] == index:
+                    self.largest_negatives.popleft()
+        return x
+
+    def largest_negative (self):
+        return self.largest_negatives[0][1] if self.largest_negatives else None
+
+    def max_factors (self):
+        '''
+        The factored maximum product of the window, like max_product_factored()
+        '''
+        if not self.window:
+            raise ValueError('No panels')
+        factors = Counter(self.factors)
+        if self.negatives % 2 == 1:
+            if len(self.window) - self.zeros == 1:
+                return factors if self.zeros == 0 else Counter({0: 1})
+            largest_negative = self.largest_negative()
+            factors[largest_negative] -= 1
+            if factors[largest_negative] == 0:
+                del factors[largest_negative]
+        if not factors:
+            return Counter({0: 1})
+        return factors
+
+    def log10 (self):
+        '''
+        log10 of the absolute value of the maximum product, -inf if it's 0
+        '''
+        if not self.window:
+            raise ValueError('No panels')
+        nonzero = len(self.window) - self.zeros
+        if self.negatives % 2 == 1:
+            if nonzero == 1:
+                return self.log_sum if self.zeros == 0 else float('-inf')
+            return self.log_sum - math.log10(-self.largest_negative())
+        if nonzero == 0:
+            return float('-inf')
+        return self.log_sum
+
+    def value (self):
+        return factored_value(self.max_factors())
+
+    def answer (self):
+        return format_decimal(self.value())
@@ -0,0 +1,144 @@
+'''
+Checks for 2_1_power_hungry.py, against trying every subset of panels.
+'''
+
+import math
+from itertools import combinations
+import os
+import random
+import tempfile
+
+from challenge_loader import load, skip_without_numpy
+
+power = load('2_1_power_hungry')
+
+def best_subset(xs):
+    best = None
+    for size in range(1, len(xs) + 1):
+        for subset in combinations(xs, size):
+            product = 1
+            for x in subset:
+                product *= x
+            if best is None or product > best:
+                best = product
+    return str(best)
+
+def random_panels(rng, count, most=8):
+    return [ [ rng.randint(-5, 5) for _ in range(rng.randint(1, most)) ] for _ in range(count) ]
+
+def test_answer():
+    assert power.answer([2, 0, 2, 2, 0]) == '8'
+    assert power.answer([-2, -3, 4, -5]) == '60'
+    for xs in random_panels(random.Random(0), 2000):
+        expected = best_subset(xs)
+        assert power.answer(xs) == expected
+        assert power.answer_stream(xs) == expected
+        assert power.answer_stream(iter(xs)) == expected
+
+def test_answer_stream_numpy():
+    skip_without_numpy(power)
+    np = power.np
+    chunk_size = power.CHUNK_SIZE
+    # Small chunks, so the panels are spread over many of them
+    power.CHUNK_SIZE = 3
+    try:
+        for xs in random_panels(random.Random(1), 1000, most=20):
+            assert power.answer_stream(np.array(xs)) == power.answer(xs)
+    finally:
+        power.CHUNK_SIZE = chunk_size
+
+    xs = np.random.default_rng(2).integers(-50, 50, 300000)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'panels.bin')
+        xs.tofile(path)
+        mapped = np.memmap(path, dtype=np.int64, mode='r')
+        assert power.max_product(mapped) == power.max_product(xs.tolist())
+        del mapped
+
+def test_answer_stream_huge():
+    # Products past the 4300 digits str() accepts
+    assert power.answer_stream([1000] * 2000) == '1' + '0' * 6000
+    assert power.answer_stream([-1000] * 2001 + [-1]) == '1' + '0' * 6003
+    assert power.answer_stream(iter([-10] * 4999 + [0])) == '1' + '0' * 4998
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'panels.txt')
+        with open(path, 'w') as f:
+            f.write('-1000\n' * 3000)
+        assert power.answer_file(path) == '1' + '0' * 9000
+
+def test_products():
+    rng = random.Random(3)
+    for count in range(40):
+        nums = [ rng.randint(-9, 9) or 1 for _ in range(count) ]
+        expected = 1
+        for x in nums:
+            expected *= x
+        assert power.product_tree(nums) == expected
+        assert power.multiply_list(nums) == expected
+    nums = [ rng.randint(2, 1000) for _ in range(5000) ]
+    assert power.multiply_parallel(nums, workers=2, chunksize=300) == power.multiply_list(nums)
+
+def test_max_product_factored():
+    for xs in random_panels(random.Random(4), 2000):
+        expected = int(best_subset(xs))
+        factors, log10 = power.max_product_factored(xs)
+        assert power.factored_value(factors) == expected
+        if expected == 0:
+            assert log10 == float('-inf')
+        else:
+            assert abs(log10 - math.log10(abs(expected))) < 1e-9
+        if power.np is not None:
+            assert power.max_product_factored(power.np.array(xs))[0] == factors
+
+def test_sliding_max_product():
+    rng = random.Random(5)
+    for size in range(1, 9):
+        sliding = power.SlidingMaxProduct(size)
+        window = []
+        for _ in range(600):
+            if window and rng.random() < 0.2:
+                assert sliding.pop() == window.pop(0)
+            else:
+                x = rng.choice([0, rng.randint(-6, 6)])
+                sliding.push(x)
+                window = (window + [x])[-size:]
+            assert len(sliding) == len(window)
+            if not window:
+                continue
+            expected = best_subset(window)
+            assert sliding.answer() == expected
+            log10 = sliding.log10()
+            if expected == '0':
+                assert log10 == float('-inf')
+            else:
+                assert abs(log10 - math.log10(abs(int(expected)))) < 1e-6
+
+def test_sliding_max_product_huge():
+    sliding = power.SlidingMaxProduct(1500)
+    for _ in range(2000):
+        sliding.push(-1000)
+    # An even number of negatives, past the 4300 digits str() accepts
+    assert sliding.answer() == '1' + '0' * 4500
+    # 1499 negatives, so one is left out
+    sliding.push(7)
+    assert sliding.answer() == '7' + '0' * 4494
+    assert sliding.pop() == -1000
+    assert sliding.answer() == '7' + '0' * 4494
+
+def test_answer_file():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'panels.txt')
+        with open(path, 'w') as f:
+            f.write('2\n-3\n1\n0\n-5\n')
+        assert power.answer_file(path) == '30'
+
+if __name__ == '__main__':
+    test_answer()
+    if power.np is not None:
+        test_answer_stream_numpy()
+    test_answer_stream_huge()
+    test_products()
+    test_max_product_factored()
+    test_sliding_max_product()
+    test_sliding_max_product_huge()
+    test_answer_file()
@@ -62,34 +62,391 @@ But we can do some optimization. If floor(big_number/small_number) >= 2, then we
 in one step rather than repeating the same process over and over again. 
 '''
 
-import math
+from math import gcd
 
-def answer(M, F):
+from number_input import format_decimal, iter_numbers, to_int
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def answer(M, F, byteorder=None):
     # M, F > 0
-    m = int(M)
-    f = int(F)
-    
-    counter = 0
-    while m != 1 or f != 1:
-        # (1,1) is the trivial case
-        if m == f or m <= 0 or f <= 0:
-            return 'impossible'
-        if m > f:
-            times = get_times_addition(m,f)
-            counter += times
-            m = m - f*times
+    # Decimal strings are converted in subquadratic time, 0x hex strings are accepted too.
+    # Bytes are text as well, unless byteorder says they are numbers in binary.
+    generations = count_generations(to_int(M, byteorder), to_int(F, byteorder))
+    if generations is None:
+        return 'impossible'
+    # The count can be as long as the inputs, past the 4300 digits str() accepts
+    return format_decimal(generations)
+
+'''
+Going backwards from (M, F) is just Euclid's algorithm: each repeated subtraction is a division, 
+and the number of generations is the number of subtractions. So it's the sum of the quotients, 
+i.e. the continued fraction of M/F, minus 1 for the last step, which lands on (1, 0) instead of (1, 1).
+It's only possible if Euclid ends with a gcd of 1.
+    e.g. 7/4 = 1 + 1/(1 + 1/3), so (4, 7) takes 1 + 1 + 3 - 1 = 4 generations
+
+For numbers with hundreds of thousands of digits, even a division per quotient is slow: 
+every step works on the full numbers while only shaving a few bits off. 
+The quotients mostly depend on the leading bits though (Lehmer's idea). Running Euclid on the top half of the bits 
+gives, recursively, the first half of the quotients at once, as a 2x2 matrix 
+    M = [[q1, 1], [1, 0]] * [[q2, 1], [1, 0]] * ... 
+with (a, b) = M * (x, y), which we apply to the full numbers with a few big multiplications (half-gcd).
+
+The last quotients found from the top bits can be off. But since every quotient is at least 1 and the entries of M 
+are positive, the quotients are right exactly when the remainders (x, y) = M^-1 * (a, b) still satisfy 0 <= y < x.
+If they don't, we drop the last quotient and check again.
+'''
+
+# Below this many bits, plain divisions are faster than splitting
+HALF_GCD_THRESHOLD = 1024
+
+IDENTITY = (1, 0, 0, 1)
+
+def multiply(A, B):
+    # 2x2 matrices as (a00, a01, a10, a11)
+    return (A[0] * B[0] + A[1] * B[2], A[0] * B[1] + A[1] * B[3],
+            A[2] * B[0] + A[3] * B[2], A[2] * B[1] + A[3] * B[3])
+
+def euclid_step(M, q):
+    # M * [[q, 1], [1, 0]]
+    return (M[0] * q + M[1], M[0], M[2] * q + M[3], M[2])
+
+def remainders(M, quotients, a, b):
+    # (x, y) = M^-1 * (a, b), where det(M) = (-1)^len(quotients)
+    x = M[3] * a - M[1] * b
+    y = M[0] * b - M[2] * a
+    if len(quotients) % 2:
+        x, y = -x, -y
+    return x, y
+
+def fix_quotients(M, quotients, a, b):
+    '''
+    Drop the quotients found from the top bits that don't hold for (a, b)
+    Returns (M, quotients, x, y)
+    '''
+    while True:
+        x, y = remainders(M, quotients, a, b)
+        if not quotients or 0 <= y < x:
+            return M, quotients, x, y
+        # M * [[0, 1], [1, -q]] undoes the last step
+        q = quotients.pop()
+        M = (M[1], M[0] - q * M[1], M[3], M[2] - q * M[3])
+
+def half_gcd(a, b):
+    '''
+    Euclid's quotients of a/b (a >= b >= 0) until the remainder is about half as long as a
+    Returns (M, quotients, x, y) with (a, b) = M * (x, y)
+    '''
+    half = a.bit_length() // 2
+    M, quotients, x, y = IDENTITY, [], a, b
+
+    if b.bit_length() > half and a.bit_length() >= HALF_GCD_THRESHOLD:
+        # 1) The top half of the bits gives the first quotients
+        M, quotients, _, _ = half_gcd(a >> half, b >> half)
+        M, quotients, x, y = fix_quotients(M, quotients, a, b)
+
+        # 2) And the top of what's left gives the next ones,
+        # as long as that top is shorter than a (it can't be if step 1 made little progress)
+        if y.bit_length() > half and 2 * (x.bit_length() - half) < a.bit_length():
+            shift = 2 * half - x.bit_length()
+            M2, quotients2, _, _ = half_gcd(x >> shift, y >> shift)
+            M2, quotients2, x, y = fix_quotients(M2, quotients2, x, y)
+            M = multiply(M, M2)
+            quotients += quotients2
+
+    # 3) Plain divisions for the rest
+    while y.bit_length() > half:
+        q, r = divmod(x, y)
+        M = euclid_step(M, q)
+        quotients.append(q)
+        x, y = y, r
+
+    return M, quotients, x, y
+
+def euclid_quotient_sum(a, b):
+    '''
+    Returns (sum of Euclid's quotients of a/b, gcd(a, b)) for a, b >= 0
+    '''
+    if a < b:
+        a, b = b, a
+    total = 0
+    while b:
+        if b.bit_length() >= HALF_GCD_THRESHOLD:
+            M, quotients, a, b = half_gcd(a, b)
+            total += sum(quotients)
+            if not b:
+                break
+        q, r = divmod(a, b)
+        total += q
+        a, b = b, r
+    return total, a
+
+def count_generations(m, f):
+    '''
+    Generations to go from (1, 1) to (m, f), or None if it can't be done
+    '''
+    if m <= 0 or f <= 0:
+        return None
+    total, common = euclid_quotient_sum(m, f)
+    if common != 1:
+        return None
+    return total - 1
+
+'''
+Many targets at once
+
+For a whole grid of (M, F) targets that fit in 64 bits, Euclid runs on every pair at once: 
+one array divmod() per round, and pairs that are done (remainder 0) drop out of the arrays. 
+Anything bigger than an int64 goes through count_generations() one at a time.
+'''
+
+IMPOSSIBLE = -1
+INT64_MAX = 2**63 - 1
+
+def as_counts(values):
+    '''
+    values as an array: integer arrays are kept as they are, 
+    anything else (lists, strings, big ints, floats) becomes an object array of ints, one element at a time.
+    Like answer(), a value that isn't a whole number raises ValueError instead of being truncated.
+    '''
+    if isinstance(values, np.ndarray) and values.dtype.kind in 'iu':
+        return values
+    values = np.asarray(values, dtype=object)
+    counts = np.empty(values.shape, dtype=object)
+    counts.ravel()[:] = [ to_int(x) for x in values.ravel() ]
+    return counts
+
+def answer_many(M_array, F_array):
+    '''
+    Generations for every pair of M_array and F_array, as an int64 array of the same shape with IMPOSSIBLE (-1)
+    where it can't be done. Values can be ints, strings or int arrays.
+    The array has dtype object if some count doesn't fit in 64 bits.
+    '''
+    if np is None:
+        raise ImportError('answer_many() needs NumPy')
+
+    M_array = as_counts(M_array)
+    F_array = as_counts(F_array)
+    if M_array.shape != F_array.shape:
+        raise ValueError('M_array and F_array must have the same shape')
+    shape = M_array.shape
+    ms = M_array.ravel()
+    fs = F_array.ravel()
+
+    # Comparisons work the same on integer and object arrays
+    positive = np.asarray((ms > 0) & (fs > 0), dtype=bool)
+    if ms.dtype.kind == 'i' and fs.dtype.kind == 'i':
+        fits = positive
+    else:
+        fits = positive & np.asarray((ms <= INT64_MAX) & (fs <= INT64_MAX), dtype=bool)
+    result = np.full(len(ms), IMPOSSIBLE, dtype=np.int64)
+
+    # 1) Euclid on all the 64-bit lanes together
+    lanes = np.flatnonzero(fits)
+    if len(lanes):
+        m = ms[lanes].astype(np.int64)
+        f = fs[lanes].astype(np.int64)
+        a = np.maximum(m, f)
+        b = np.minimum(m, f)
+        total = np.zeros(len(lanes), dtype=np.int64)
+
+        active = np.arange(len(lanes))
+        while len(active):
+            q, r = np.divmod(a[active], b[active])
+            total[active] += q
+            a[active] = b[active]
+            b[active] = r
+            active = active[r != 0]
+
+        # a is now the gcd
+        result[lanes] = np.where(a == 1, total - 1, IMPOSSIBLE)
+
+    # 2) The exact engine for the positive counts that don't fit
+    big = {}
+    for i in np.flatnonzero(positive & ~fits):
+        generations = count_generations(int(ms[i]), int(fs[i]))
+        if generations is not None:
+            big[i] = generations
+    if any(generations > INT64_MAX for generations in big.values()):
+        result = result.astype(object)
+    for i, generations in big.items():
+        result[i] = generations
+
+    return result.reshape(shape)
+
+'''
+Going forward
+
+The tree of configurations from (1, 1), where (m, f) has the children (m, m + f) and (m + f, f), 
+is the Calkin-Wilf tree of the fractions m/f. Every pair with gcd 1 shows up exactly once, 
+at a depth equal to its number of generations.
+
+To list every configuration up to some generation, we don't need to keep a whole level around: 
+Newman's formula gives the next fraction in breadth-first order from the current one,
+    x -> 1 / (2 * floor(x) - x + 1)
+i.e. (m, f) -> (f, (2 * (m // f) + 1) * f - m), and it moves from the end of one level to the start of the next.
+
+Counting doesn't need a walk either:
+    - generation g has 2^g configurations, so up to g there are 2^(g+1) - 1
+    - configurations with m + f = s are the m < s with gcd(m, s) = 1, i.e. phi(s) of them.
+      So with m + f <= limit there are phi(2) + ... + phi(limit), which has a sublinear recursion.
+'''
+
+def next_configuration(m, f):
+    # Newman's formula: the next configuration in breadth-first order
+    return f, (2 * (m // f) + 1) * f - m
+
+def reachable(max_generation=None, max_total=None, order='generation'):
+    '''
+    Yield (M, F, generation) for every configuration reachable in at most max_generation
+    generations and/or with M + F <= max_total, in one of these orders:
+        generation: by generation, then left to right in the tree
+        total: by M + F, then by M (needs max_total)
+        depth: depth-first, (M, M + F) before (M + F, F)
+    '''
+    if max_generation is None and max_total is None:
+        raise ValueError('Give max_generation, max_total or both')
+
+    if order == 'generation':
+        if max_total is None:
+            m, f = 1, 1
+            for generation in range(max_generation + 1):
+                for i in range(2 ** generation):
+                    yield m, f, generation
+                    m, f = next_configuration(m, f)
+            return
+
+        # Every generation adds at least 1 to M + F, which starts at 2
+        if max_generation is None or max_generation > max_total - 2:
+            max_generation = max_total - 2
+        # The walk above goes through all 2^g configurations of a generation, most of them too big.
+        # Instead, go depth-first to each generation in turn, skipping subtrees over max_total:
+        # a configuration is never smaller than its parent.
+        for generation in range(max_generation + 1):
+            found = False
+            stack = [(1, 1, 0)]
+            while stack:
+                m, f, depth = stack.pop()
+                if m + f > max_total:
+                    continue
+                if depth == generation:
+                    found = True
+                    yield m, f, generation
+                    continue
+                stack.append((m + f, f, depth + 1))
+                stack.append((m, m + f, depth + 1))
+            if not found:
+                # Nothing in this generation fits, so nothing further down does either
+                return
+
+    elif order == 'total':
+        if max_total is None:
+            raise ValueError('Total order needs max_total')
+        for total in range(2, max_total + 1):
+            for m in range(1, total):
+                if gcd(m, total) == 1:
+                    generation = count_generations(m, total - m)
+                    if max_generation is None or generation <= max_generation:
+                        yield m, total - m, generation
+
+    elif order == 'depth':
+        # Only the path to the current configuration is stored
+        stack = [(1, 1, 0)]
+        while stack:
+            m, f, generation = stack.pop()
+            if max_total is not None and m + f > max_total:
+                continue
+            yield m, f, generation
+            if max_generation is None or generation < max_generation:
+                stack.append((m + f, f, generation + 1))
+                stack.append((m, m + f, generation + 1))
+
+    else:
+        raise ValueError('Unknown order: ' + str(order))
+
+def totient_sum(n, cache=None):
+    '''
+    phi(1) + ... + phi(n), from
+        sum over d of totient_sum(n // d) = n * (n + 1) / 2
+    grouping the d that share the same n // d. A sieve covers the small values.
+    '''
+    if cache is None:
+        # Sieve phi up to about n^(2/3)
+        limit = max(2, int(n ** (2.0 / 3)) + 1)
+        phi = list(range(limit + 1))
+        for p in range(2, limit + 1):
+            if phi[p] == p:
+                for k in range(p, limit + 1, p):
+                    phi[k] -= phi[k] // p
+        cache = {}
+        running = 0
+        for k in range(1, limit + 1):
+            running += phi[k]
+            cache[k] = running
+        cache[0] = 0
+
+    # Without recursion: values of n // d come in decreasing order of d
+    pending = [n]
+    while pending:
+        x = pending[-1]
+        if x in cache:
+            pending.pop()
+            continue
+        total = x * (x + 1) // 2
+        missing = []
+        d = 2
+        while d <= x:
+            q = x // d
+            last = x // q
+            if q in cache:
+                total -= (last - d + 1) * cache[q]
+            else:
+                missing.append(q)
+            d = last + 1
+        if missing:
+            pending.extend(missing)
         else:
-            times = get_times_addition(f,m)
-            counter += times
-            f = f - m*times
-        
-    return str(counter)
-
-def get_times_addition(m,f):
-    # Wish I had a better name for this function...
-    # Returns the quotient between m and f, rounded down. 
-    # m >= f
-    t = int(math.floor(m/f))
-    if m%f == 0:
-        t -= 1
-    return t
+            cache[x] = total
+            pending.pop()
+    return cache[n]
+
+def count_reachable(max_generation=None, max_total=None):
+    '''
+    The number of configurations reachable() would yield, without listing them
+    when only one of the limits is given
+    '''
+    if max_generation is None and max_total is None:
+        raise ValueError('Give max_generation, max_total or both')
+    if max_total is None:
+        return 2 ** (max_generation + 1) - 1
+    if max_generation is None:
+        # phi(1) counts (1, 0), which isn't a configuration
+        return totient_sum(max_total) - 1 if max_total >= 2 else 0
+
+    # Both limits: walk the tree, but only count
+    count = 0
+    stack = [(1, 1, 0)]
+    while stack:
+        m, f, generation = stack.pop()
+        if m + f > max_total:
+            continue
+        count += 1
+        if generation < max_generation:
+            stack.append((m + f, f, generation + 1))
+            stack.append((m, m + f, generation + 1))
+    return count
+
+def answer_file(path):
+    '''
+    answer() for a file of numbers, one per line: M on one line, F on the next.
+    The file is read through a memory map, so it never has to fit in memory.
+    '''
+    numbers = iter_numbers(path)
+    for m in numbers:
+        try:
+            f = next(numbers)
+        except StopIteration:
+            raise ValueError('The last M has no F')
+        yield answer(m, f)
@@ -0,0 +1,256 @@
+'''
+Checks for 3_1_bomb_baby.py, against walking the generations back one subtraction at a time,
+and for the half-gcd engine against plain divmod() Euclid: Fibonacci pairs (all quotients 1),
+huge quotients, and sizes around HALF_GCD_THRESHOLD.
+'''
+
+from fractions import Fraction
+import os
+import random
+import tempfile
+
+from challenge_loader import load, skip_without_numpy
+
+bomb = load('3_1_bomb_baby')
+
+def subtract_back(m, f):
+    # The generations back to (1, 1) one at a time, None if it's impossible
+    generations = 0
+    while (m, f) != (1, 1):
+        if m <= 0 or f <= 0 or m == f:
+            return None
+        if m > f:
+            m -= f
+        else:
+            f -= m
+        generations += 1
+    return generations
+
+def test_answer():
+    assert bomb.answer('2', '1') == '1'
+    assert bomb.answer('4', '7') == '4'
+    assert bomb.answer('2', '4') == 'impossible'
+    for m in range(1, 60):
+        for f in range(1, 60):
+            expected = subtract_back(m, f)
+            assert bomb.answer(str(m), str(f)) == ('impossible' if expected is None else str(expected))
+
+def test_answer_huge_count():
+    # (1, 10^5000) takes 10^5000 - 1 generations
+    assert bomb.answer('1', '1' + '0' * 5000) == '9' * 5000
+    assert bomb.answer('2' + '0' * 6000, '1') == '1' + '9' * 6000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bombs.txt')
+        with open(path, 'w') as f:
+            f.write('1\n1' + '0' * 5000 + '\n')
+        assert list(bomb.answer_file(path)) == ['9' * 5000]
+
+def test_bytes():
+    # Bytes are text, unless a byteorder says they are binary
+    assert bomb.answer(b'4', b'7') == bomb.answer('4', '7')
+    m, f = 3 ** 500, 2 ** 700 + 1
+    expected = bomb.answer(m, f)
+    assert bomb.answer(str(m).encode('ascii'), str(f).encode('ascii')) == expected
+    for byteorder in ('big', 'little'):
+        assert bomb.answer(m.to_bytes(100, byteorder), f.to_bytes(100, byteorder), byteorder) == expected
+
+def test_malformed_numbers():
+    # The low half of a long string is its last 2000 digits, so a stray sign or space there
+    # has to be caught before it is split
+    tail = '9' * 1999
+    for M in ('1-' + tail, '1+' + tail, '1 ' + tail, '--5' + '0' * 2000, '+-' + tail, '1_000', '', '-', b'1-' + tail.encode('ascii')):
+        try:
+            bomb.answer(M, '2')
+            assert False, M[:10]
+        except ValueError:
+            pass
+    assert bomb.answer(' +' + tail + '\n', '2') == bomb.answer(int(tail), 2)
+
+def test_number_types():
+    assert bomb.answer(4.0, 7) == bomb.answer(4, 7.0) == bomb.answer(4, 7)
+    try:
+        import numpy as np
+        assert bomb.answer(np.int64(4), np.uint32(7)) == bomb.answer(4, 7)
+    except ImportError:
+        pass
+    try:
+        bomb.answer(2.5, 1)
+        assert False
+    except ValueError:
+        pass
+
+def test_answer_many():
+    skip_without_numpy(bomb)
+    np = bomb.np
+    rng = random.Random(1)
+    ms = [ rng.choice([rng.randint(-2, 50), rng.randint(1, 10**15), rng.randint(1, 10**30)]) for _ in range(400) ]
+    fs = [ rng.choice([rng.randint(-2, 50), rng.randint(1, 10**15), rng.randint(1, 10**30)]) for _ in range(400) ]
+    expected = [ bomb.answer(m, f) for m, f in zip(ms, fs) ]
+    expected = [ bomb.IMPOSSIBLE if e == 'impossible' else int(e) for e in expected ]
+
+    assert bomb.answer_many(ms, fs).tolist() == expected
+    assert bomb.answer_many([ str(m) for m in ms ], [ str(f) for f in fs ]).tolist() == expected
+
+    # Integer arrays keep their shape
+    small = [ i for i, (m, f) in enumerate(zip(ms, fs)) if abs(m) < 2**62 and abs(f) < 2**62 ][:150]
+    M = np.array([ ms[i] for i in small ], dtype=np.int64).reshape(10, 15)
+    F = np.array([ fs[i] for i in small ], dtype=np.int64).reshape(10, 15)
+    result = bomb.answer_many(M, F)
+    assert result.shape == (10, 15)
+    assert result.ravel().tolist() == [ expected[i] for i in small ]
+
+    # uint64 counts above the int64 range go through the exact engine
+    M = np.array([2**64 - 1, 5, 0], dtype=np.uint64)
+    F = np.array([2**63, 3, 1], dtype=np.uint64)
+    assert bomb.answer_many(M, F).tolist() == [int(bomb.answer(2**64 - 1, 2**63)), 3, bomb.IMPOSSIBLE]
+
+def test_answer_many_floats():
+    skip_without_numpy(bomb)
+    np = bomb.np
+    assert bomb.answer_many(np.array([4.0, 2.0]), [7, 1]).tolist() == [4, 1]
+    for M in ([2.5], np.array([2.5]), [Fraction(5, 2)]):
+        try:
+            bomb.answer_many(M, [1])
+            assert False, M
+        except ValueError:
+            pass
+
+def plain_quotients(a, b):
+    # Euclid's quotients of a/b, and the gcd
+    quotients = []
+    while b:
+        q, r = divmod(a, b)
+        quotients.append(q)
+        a, b = b, r
+    return quotients, a
+
+def from_quotients(quotients):
+    # (a, b) whose Euclid quotients are exactly quotients (the last one at least 2)
+    a, b = 1, 0
+    for q in reversed(quotients):
+        a, b = q * a + b, a
+    return a, b
+
+def fibonacci_pair(bits):
+    a, b = 1, 1
+    while a.bit_length() < bits:
+        a, b = a + b, a
+    return a, b
+
+def euclid_pairs(rng):
+    pairs = []
+    threshold = bomb.HALF_GCD_THRESHOLD
+    for bits in (threshold - 2, threshold - 1, threshold, threshold + 1, threshold + 2, 2 * threshold, 5000):
+        pairs.append(fibonacci_pair(bits))
+        a = rng.getrandbits(bits) | (1 << (bits - 1))
+        pairs.append((a, rng.randrange(1, a)))
+    # Huge quotients, alone or mixed with small ones, where the top bits alone get the last quotients wrong
+    for size in (1, 2, 30, 600):
+        quotients = [ rng.choice([1, 2, 3, rng.getrandbits(size) + 1]) for _ in range(2000 // size + 5) ]
+        pairs.append(from_quotients(quotients + [2]))
+        pairs.append(from_quotients([2 ** 3000] + quotients + [2]))
+    # A gcd other than 1
+    a, b = fibonacci_pair(1500)
+    pairs.append((a * 12345, b * 12345))
+    return pairs
+
+def test_half_gcd():
+    rng = random.Random(5)
+    for a, b in euclid_pairs(rng):
+        if a < b:
+            a, b = b, a
+        expected, common = plain_quotients(a, b)
+        assert bomb.euclid_quotient_sum(a, b) == (sum(expected), common)
+        assert bomb.euclid_quotient_sum(b, a) == (sum(expected), common)
+
+        M, quotients, x, y = bomb.half_gcd(a, b)
+        # The first quotients, in order, and the remainders they lead to
+        assert quotients == expected[:len(quotients)]
+        assert (a, b) == (M[0] * x + M[1] * y, M[2] * x + M[3] * y)
+        assert 0 <= y < x or (y == 0 and x == common)
+        assert y.bit_length() <= a.bit_length() // 2
+        built = bomb.IDENTITY
+        for q in quotients:
+            built = bomb.euclid_step(built, q)
+        assert built == M
+
+def test_half_gcd_threshold():
+    # A low threshold makes the recursion go much deeper on the same numbers
+    threshold = bomb.HALF_GCD_THRESHOLD
+    try:
+        for bomb.HALF_GCD_THRESHOLD in (4, 16, 64, 300):
+            rng = random.Random(bomb.HALF_GCD_THRESHOLD)
+            for a, b in euclid_pairs(rng)[:12]:
+                assert bomb.euclid_quotient_sum(a, b) == (sum(plain_quotients(max(a, b), min(a, b))[0]), bomb.gcd(a, b))
+    finally:
+        bomb.HALF_GCD_THRESHOLD = threshold
+
+def test_fix_quotients():
+    rng = random.Random(6)
+    quotients = [ rng.randint(1, 50) for _ in range(40) ]
+    a, b = from_quotients(quotients + [2])
+    M = bomb.IDENTITY
+    for q in quotients[:20]:
+        M = bomb.euclid_step(M, q)
+    # One quotient too many, then a last quotient too big
+    for wrong in ([quotients[20] + 1], [quotients[20], quotients[21] + 5]):
+        W = M
+        for q in wrong:
+            W = bomb.euclid_step(W, q)
+        fixed, kept, x, y = bomb.fix_quotients(W, quotients[:20] + wrong, a, b)
+        assert kept == quotients[:len(kept)] and len(kept) >= 20
+        assert 0 <= y < x
+
+def test_reachable():
+    for order in ('generation', 'depth'):
+        found = list(bomb.reachable(max_generation=6, order=order))
+        assert len(found) == bomb.count_reachable(max_generation=6)
+        for m, f, generation in found:
+            assert subtract_back(m, f) == generation
+    found = list(bomb.reachable(max_total=60, order='total'))
+    expected = [ (m, f) for m in range(1, 60) for f in range(1, 60) if m + f <= 60 and subtract_back(m, f) is not None ]
+    assert sorted((m, f) for m, f, _ in found) == sorted(expected)
+    assert bomb.count_reachable(max_total=60) == len(expected)
+    assert bomb.count_reachable(max_generation=5, max_total=30) == len(list(bomb.reachable(5, 30, order='depth')))
+
+def test_reachable_pruned():
+    # Same order as filtering the full walk by total
+    walked = [ found for found in bomb.reachable(max_generation=13, order='generation') if found[0] + found[1] <= 15 ]
+    assert list(bomb.reachable(max_generation=13, max_total=15)) == walked
+    assert list(bomb.reachable(max_generation=20, max_total=15)) == walked
+    assert list(bomb.reachable(max_total=15)) == walked
+    # A walk through 2^41 configurations if it went generation by generation
+    found = list(bomb.reachable(max_generation=40, max_total=30))
+    assert len(found) == bomb.count_reachable(max_generation=40, max_total=30) == bomb.count_reachable(max_total=30)
+    assert [ generation for _, _, generation in found ] == sorted(generation for _, _, generation in found)
+    assert list(bomb.reachable(max_generation=5, max_total=1)) == []
+
+def test_totient_sum():
+    phi_sum = 0
+    for n in range(1, 400):
+        phi_sum += sum(1 for k in range(1, n + 1) if bomb.gcd(k, n) == 1)
+        assert bomb.totient_sum(n) == phi_sum
+
+def test_answer_file():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bombs.txt')
+        with open(path, 'w') as f:
+            f.write('2\n1\n4\n7\n2\n4\n')
+        assert list(bomb.answer_file(path)) == ['1', '4', 'impossible']
+
+if __name__ == '__main__':
+    test_answer()
+    test_answer_huge_count()
+    test_bytes()
+    test_malformed_numbers()
+    test_number_types()
+    if bomb.np is not None:
+        test_answer_many()
+        test_answer_many_floats()
+    test_half_gcd()
+    test_half_gcd_threshold()
+    test_fix_quotients()
+    test_reachable()
+    test_reachable_pruned()
+    test_totient_sum()
+    test_answer_file()
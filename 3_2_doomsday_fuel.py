@@ -80,8 +80,19 @@ To set up the matrix, we also need to group all transient states and absorbing s
 If the input is [ transient, absorbing, transient ], we need to reorder the rows and columns so that the matrix becomes [ transient, transient, absorbing ].
 '''
 
-from fractions import Fraction, gcd
+from collections import OrderedDict, deque
+from fractions import Fraction
 from functools import reduce
+import heapq
+from itertools import islice
+from math import gcd
+import os
+import sys
+import time
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 def organize (m):
     to_return = []
@@ -173,7 +184,7 @@ def lcm (a,b):
     '''
     Find the lowest common multiple of a and b
     '''
-    return int(a * b / gcd(a,b))
+    return a * b // gcd(a,b)
 
 def lcmm (*args):
     '''
@@ -234,10 +245,1268 @@ def answer(m):
     denominators = [ p.denominator for p in prob ]
     lowest_common_multiple = lcmm(*denominators)
     # Scale numerators if necessary
-    result = [ int(p.numerator * (lowest_common_multiple / p.denominator)) for p in prob ]
+    result = [ int(p.numerator * (lowest_common_multiple // p.denominator)) for p in prob ]
     result.append(int(lowest_common_multiple))
     return result
 
+
+'''
+Fraction-free elimination (Bareiss)
+
+Every update in inverse() creates a new Fraction and runs a gcd on it, which adds up quickly 
+once there are hundreds of transient states. 
+
+We can stay in integers instead. Multiply row i of (I - Q) by the row sum s_i of state i in the input:
+    s_i * (I - Q) = s_i * I - counts
+and the R part becomes the raw counts into the absorbing states. Both come straight from m, no normalizing needed.
+Solving (s*I - counts) * X = C gives the same X = F*R as before, since the scaling cancels on both sides.
+
+Bareiss' trick keeps everything an integer during the elimination:
+    row[c] = (pivot * row[c] - row[k] * pivot_row[c]) / previous_pivot
+and the division is always exact. The last pivot is the determinant, and back substitution 
+gives det * X, again in integers. So we only need to reduce by gcd once, at the end.
+'''
+
+def get_state_indices (m):
+    '''
+    Split the states into transient and absorbing ones, both in input order
+    '''
+    transient_index = []
+    absorbing_index = []
+    for r in range(len(m)):
+        if sum(m[r]) == 0:
+            absorbing_index.append(r)
+        else:
+            transient_index.append(r)
+    return transient_index, absorbing_index
+
+def get_count_system (m, transient_index, absorbing_index):
+    '''
+    Build A = s*I - counts (transient to transient) and C = counts (transient to absorbing)
+    where s is the row sum of each transient state
+    '''
+    A = []
+    C = []
+    for i in transient_index:
+        s = sum(m[i])
+        A.append([ (s if i == j else 0) - m[i][j] for j in transient_index ])
+        C.append([ m[i][j] for j in absorbing_index ])
+    return A, C
+
+def bareiss_factor (A):
+    '''
+    Fraction-free forward elimination of the square int matrix A.
+    Keeps the row swaps and the ratios of every step, so that the same elimination 
+    can be replayed later on any right hand side without touching A again.
+    '''
+    dim = len(A)
+    upper = [ list(row) for row in A ]
+    steps = []
+
+    previous = 1
+    for k in range(dim):
+        swap = k
+        if upper[k][k] == 0:
+            # Swap in a row with a non-zero pivot
+            for r in range(k+1, dim):
+                if upper[r][k] != 0:
+                    upper[k], upper[r] = upper[r], upper[k]
+                    swap = r
+                    break
+            else:
+                raise ValueError('Matrix is singular')
+        pivot_row = upper[k]
+        pivot = pivot_row[k]
+        ratios = []
+        for r in range(k+1, dim):
+            row = upper[r]
+            ratio = row[k]
+            ratios.append(ratio)
+            for c in range(k+1, dim):
+                row[c] = (pivot * row[c] - ratio * pivot_row[c]) // previous
+            row[k] = 0
+        steps.append((swap, previous, ratios))
+        previous = pivot
+
+    return upper, steps
+
+def bareiss_solve_factored (factor, B):
+    '''
+    Solve A * X = B given factor = bareiss_factor(A).
+    B has one column per right hand side.
+    Returns (det, X) where X holds integers and the solution is X / det.
+    '''
+    upper, steps = factor
+    dim = len(upper)
+    width = len(B[0]) if B else 0
+    rhs = [ list(row) for row in B ]
+
+    # 1) Replay the forward elimination on the right hand side
+    for k in range(dim):
+        swap, previous, ratios = steps[k]
+        if swap != k:
+            rhs[k], rhs[swap] = rhs[swap], rhs[k]
+        pivot = upper[k][k]
+        pivot_rhs = rhs[k]
+        for r in range(k+1, dim):
+            row = rhs[r]
+            ratio = ratios[r-k-1]
+            for c in range(width):
+                row[c] = (pivot * row[c] - ratio * pivot_rhs[c]) // previous
+
+    # 2) Back substitution, scaled by the determinant so it stays in integers
+    det = upper[dim-1][dim-1] if dim else 1
+    X = [ [0] * width for r in range(dim) ]
+    for r in reversed(range(dim)):
+        row = upper[r]
+        for c in range(width):
+            total = det * rhs[r][c]
+            for j in range(r+1, dim):
+                total -= row[j] * X[j][c]
+            X[r][c] = total // row[r]
+
+    return det, X
+
+def bareiss_solve (A, B):
+    '''
+    Solve A * X = B with fraction-free elimination. 
+    A is a square matrix of ints, B has one column per right hand side.
+    Returns (det, X) where X holds integers and the solution is X / det.
+    '''
+    return bareiss_solve_factored(bareiss_factor(A), B)
+
+def reduce_answer (numerators, denominator):
+    '''
+    Reduce [numerators..., denominator] by their gcd, keeping the denominator positive
+    '''
+    common = reduce(gcd, numerators, denominator)
+    if denominator < 0:
+        common = -common
+    return [ n // common for n in numerators ] + [ denominator // common ]
+
+def absorbed_answer (absorbing_index, start=0):
+    '''
+    The answer when the ore starts in the absorbing state start, and stays there
+    '''
+    return [ 1 if i == start else 0 for i in absorbing_index ] + [1]
+
+def fraction_answer (prob):
+    '''
+    [numerators..., common denominator] of the probabilities in prob (Fractions or ints)
+    '''
+    lowest_common_multiple = lcmm(*[ Fraction(p).denominator for p in prob ])
+    return [ int(p * lowest_common_multiple) for p in prob ] + [lowest_common_multiple]
+
+def answer_bareiss (m):
+    transient_index, absorbing_index = get_state_indices(m)
+
+    if len(transient_index) == 0 or transient_index[0] != 0:
+        # The ore starts in an absorbing state and stays there
+        return absorbed_answer(absorbing_index)
+
+    A, C = get_count_system(m, transient_index, absorbing_index)
+    det, X = bareiss_solve(A, C)
+
+    # State 0 is the first transient state
+    return reduce_answer(X[0], det)
+
+
+'''
+One start state at a time
+
+answer() only needs the row of F*R for state 0, but inverting (I - Q) computes every row of F. 
+Row s of F*R is y*R where y is row s of F, i.e. the solution of 
+    transpose(I - Q) * y = e_s
+which is a single linear system. With A = s*I - counts as above, F = A^-1 * S (S is the diagonal of row sums),
+and S*R is just the counts C. So row s of F*R = z*C, where transpose(A) * z = e_s.
+
+The expensive part is the elimination of transpose(A), which doesn't depend on the start state.
+So we factor it once and replay the elimination on e_s for every start state we are asked about.
+That's O(t^2) per start state instead of O(t^3).
+'''
+
+def factor_chain (m):
+    '''
+    Factor the absorbing chain m once, so it can answer any start state
+    Returns (transient_index, absorbing_index, C, factor)
+    '''
+    transient_index, absorbing_index = get_state_indices(m)
+    A, C = get_count_system(m, transient_index, absorbing_index)
+    transposed = [ list(col) for col in zip(*A) ]
+    return transient_index, absorbing_index, C, bareiss_factor(transposed)
+
+def absorption_probabilities (m, starts=(0,), chain=None):
+    '''
+    Terminal state probabilities for every state in starts, in the answer() format
+    chain can be a factor_chain(m) result to reuse across calls
+    '''
+    if chain is None:
+        chain = factor_chain(m)
+    transient_index, absorbing_index, C, factor = chain
+    position = dict((state, i) for i, state in enumerate(transient_index))
+    dim = len(transient_index)
+
+    results = []
+    for start in starts:
+        if start not in position:
+            # The ore starts in an absorbing state and stays there
+            results.append(absorbed_answer(absorbing_index, start))
+            continue
+        e = [ [0] for i in range(dim) ]
+        e[position[start]][0] = 1
+        det, z = bareiss_solve_factored(factor, e)
+        numerators = []
+        for col in range(len(absorbing_index)):
+            numerators.append(sum(z[t][0] * C[t][col] for t in range(dim) if C[t][col]))
+        results.append(reduce_answer(numerators, det))
+
+    return results
+
+def answer_single (m, start=0):
+    return absorption_probabilities(m, [start])[0]
+
+
+'''
+Sparse chains
+
+Most states only go to a handful of other states, so a dense matrix is mostly zeros. 
+We keep each row as a dict of {next state: count} instead, and never build the matrix.
+
+Rather than F*R, we push the expected number of visits forward from state 0:
+    v(0) = 1 + inflow, v(j) = sum of v(i) * Q(i,j) over the states i going into j
+and the probability of ending in absorbing state a is the sum of v(i) * R(i,a).
+We keep w(i) = v(i) / s(i) so that what flows along an edge is simply w(i) * count.
+
+States that can't be reached from state 0 never get any visits, so we skip them altogether.
+Cycles are what make this a linear system. Splitting the transient states into strongly connected 
+components (Tarjan) and walking them in topological order, each component only depends on the ones 
+before it. Components of one state (the common case) are a single division:
+    w(i) * (s(i) - count(i,i)) = inflow(i)
+Small components are solved with bareiss_solve(), bigger ones with a sparse elimination (see below).
+'''
+
+def to_sparse (m):
+    '''
+    Turn a matrix of counts into a list of {next state: count} rows
+    '''
+    return [ dict((j, count) for j, count in enumerate(row) if count) for row in m ]
+
+def get_components (graph, totals, start=0):
+    '''
+    Strongly connected components of the transient states reachable from start (Tarjan),
+    without recursion since chains can be very deep.
+    Components come out in reverse topological order.
+    '''
+    index = {start: 0}
+    low = {start: 0}
+    stack = [start]
+    on_stack = set([start])
+    components = []
+
+    work = [(start, iter(graph[start]))]
+    while work:
+        state, children = work[-1]
+        for child in children:
+            if totals[child] == 0:
+                # Absorbing
+                continue
+            if child not in index:
+                index[child] = low[child] = len(index)
+                stack.append(child)
+                on_stack.add(child)
+                work.append((child, iter(graph[child])))
+                break
+            elif child in on_stack:
+                low[state] = min(low[state], index[child])
+        else:
+            # Done with all the children of state
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[state])
+            if low[state] == index[state]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.remove(member)
+                    component.append(member)
+                    if member == state:
+                        break
+                components.append(component)
+
+    return components
+
+# Components up to this size are solved as a dense matrix
+DENSE_COMPONENT = 48
+
+'''
+Sparse elimination
+
+A big component as a dense matrix costs dim^2 memory and dim^3 steps, even if each state only has a few edges.
+Eliminating one state at a time on the graph itself only touches its edges: 
+removing state k from the equations links every state going into k with every state k goes to, 
+and those new links (the fill-in) are the only extra memory.
+How much fill-in there is depends a lot on the order, so like in sparse LU we always eliminate the state 
+with the smallest Markowitz count (# of other entries in its row) * (# of other entries in its column).
+A cycle, a chain of loops or a grid stays about as sparse as it started.
+
+A = s*I - counts is diagonally dominant, and so is what's left of it after eliminating any state, 
+so the pivot can always be the diagonal entry and the order is only chosen for the fill-in.
+
+This doesn't make every component cheap. In a component where every state can get to every other one 
+through a few random edges (an expander, like a random graph with 3 edges per state), 
+any order fills the matrix in after a while, and the cost goes back to a dense elimination. 
+The exact answer of such a chain has denominators with about as many digits as there are states 
+anyway, so for thousands of states like that use answer_float() or estimate_answer() instead.
+'''
+
+def solve_sparse_system (rows, rhs):
+    '''
+    Solve sum of rows[j][i] * w[i] = rhs[j] for every j, where rows[j] is a {i: coefficient} dict 
+    with a non-zero rows[j][j], eliminating in Markowitz order.
+    rows is used up. Returns {i: w[i]} as Fractions.
+    '''
+    rows = dict((j, dict((i, Fraction(v)) for i, v in row.items() if v)) for j, row in rows.items())
+    rhs = dict((j, Fraction(rhs.get(j, 0))) for j in rows)
+    cols = dict((j, set()) for j in rows)
+    for j, row in rows.items():
+        for i in row:
+            cols[i].add(j)
+
+    def markowitz (k):
+        return (len(rows[k]) - 1) * (len(cols[k]) - 1)
+
+    heap = [ (markowitz(k), k) for k in rows ]
+    heapq.heapify(heap)
+    eliminated = set()
+    order = []
+    while heap:
+        cost, k = heapq.heappop(heap)
+        if k in eliminated or cost != markowitz(k):
+            # Stale entry, k is in the heap again with its new cost
+            continue
+        eliminated.add(k)
+        order.append(k)
+
+        pivot_row = rows[k]
+        pivot = pivot_row[k]
+        for c in pivot_row:
+            cols[c].discard(k)
+        changed = set()
+        for j in cols.pop(k):
+            row = rows[j]
+            factor = row.pop(k) / pivot
+            for c, v in pivot_row.items():
+                if c == k:
+                    continue
+                value = row.get(c, 0) - factor * v
+                if value:
+                    row[c] = value
+                    cols[c].add(j)
+                else:
+                    row.pop(c, None)
+                    cols[c].discard(j)
+                changed.add(c)
+            rhs[j] -= factor * rhs[k]
+            changed.add(j)
+        for c in changed:
+            if c not in eliminated:
+                heapq.heappush(heap, (markowitz(c), c))
+
+    # Back substitution: the row of k only has states eliminated after k
+    w = {}
+    for k in reversed(order):
+        row = rows[k]
+        total = rhs[k]
+        for c, v in row.items():
+            if c != k:
+                total -= v * w[c]
+        w[k] = total / row[k]
+    return w
+
+def solve_component (graph, totals, component, inflow):
+    '''
+    Solve transpose(s*I - counts) * w = inflow within one component
+    Returns {state: w}
+    '''
+    if len(component) == 1:
+        state = component[0]
+        return {state: Fraction(inflow[state], totals[state] - graph[state].get(state, 0))}
+
+    if len(component) > DENSE_COMPONENT:
+        members = set(component)
+        rows = dict((state, {state: totals[state]}) for state in component)
+        for state in component:
+            for next_state, count in graph[state].items():
+                if next_state in members:
+                    rows[next_state][state] = rows[next_state].get(state, 0) - count
+        return solve_sparse_system(rows, dict((state, inflow.get(state, 0)) for state in component))
+
+    position = dict((state, i) for i, state in enumerate(component))
+    dim = len(component)
+    AT = [ [0] * dim for i in range(dim) ]
+    for i, state in enumerate(component):
+        AT[i][i] += totals[state]
+        for next_state, count in graph[state].items():
+            if next_state in position:
+                AT[position[next_state]][i] -= count
+
+    # Clear the denominators of the inflow to stay in integers
+    b = [ Fraction(inflow.get(state, 0)) for state in component ]
+    scale = lcmm(*[ f.denominator for f in b ])
+    b = [ [f.numerator * (scale // f.denominator)] for f in b ]
+    det, X = bareiss_solve(AT, b)
+    return dict((state, Fraction(X[i][0], det * scale)) for i, state in enumerate(component))
+
+def answer_sparse (graph):
+    '''
+    Same as answer(m), for a chain given as to_sparse(m)
+    '''
+    totals = [ sum(row.values()) for row in graph ]
+    absorbing_index = [ i for i in range(len(graph)) if totals[i] == 0 ]
+
+    if totals[0] == 0:
+        # The ore starts in an absorbing state and stays there
+        return absorbed_answer(absorbing_index)
+
+    inflow = {0: Fraction(1)}
+    prob = {}
+    for component in reversed(get_components(graph, totals)):
+        w = solve_component(graph, totals, component, inflow)
+        for state in component:
+            inflow.pop(state, None)
+        for state in component:
+            for next_state, count in graph[state].items():
+                if next_state in w:
+                    continue
+                if totals[next_state] == 0:
+                    prob[next_state] = prob.get(next_state, 0) + w[state] * count
+                else:
+                    inflow[next_state] = inflow.get(next_state, 0) + w[state] * count
+
+    return fraction_answer([ prob.get(i, 0) for i in absorbing_index ])
+
+
+'''
+Multi-modular solve
+
+Even without Fractions, the numbers in an exact elimination grow with every step, so the 
+late steps work on huge ints. Modulo a prime p that fits in a machine word, they never grow.
+
+So we solve transpose(A) * z = e_0 (see absorption_probabilities()) modulo several primes, 
+glue the residues together with the Chinese remainder theorem, and get the fractions back 
+with rational reconstruction: for u modulo M there is at most one a/b with |a|, b <= sqrt(M/2) 
+and a = u*b (mod M), and the extended Euclid algorithm finds it. 
+The Hadamard bound of A says how many primes are always enough, but the actual fractions are 
+usually much smaller than that. So we start with a few primes, and every time the reconstruction fails 
+or doesn't pass the exact check transpose(A) * z = e_0, we double the number of primes. 
+That never costs more than twice the primes really needed.
+
+Each prime is independent, so they can be solved on a process pool. With NumPy, every 
+elimination step is one vectorized update of the rows below the pivot. The primes are below 2^24, 
+so a product of two residues is below 2^48 and thousands of updates fit in an int64 before anything overflows. 
+Only the pivot row and column are reduced modulo p at each step, the rest of the matrix only when it has 
+to be, instead of two passes of % over everything below the pivot at every step.
+'''
+
+# Residues stay below this, see solve_mod_prime()
+PRIME_LIMIT = 2**24
+
+def is_prime (n):
+    '''
+    Deterministic Miller-Rabin for n < 3.3 * 10^24
+    '''
+    if n < 2:
+        return False
+    bases = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37]
+    for p in bases:
+        if n % p == 0:
+            return n == p
+    d = n - 1
+    r = 0
+    while d % 2 == 0:
+        d //= 2
+        r += 1
+    for a in bases:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for i in range(r - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+def get_word_primes (count, below=PRIME_LIMIT):
+    '''
+    The count largest primes below below
+    '''
+    primes = []
+    n = below - 1
+    while len(primes) < count:
+        if is_prime(n):
+            primes.append(n)
+        n -= 1
+    return primes
+
+def solve_mod_prime (AT, p):
+    '''
+    Solve AT * z = e_0 modulo p with Gaussian elimination
+    Returns z as a list of ints, or None if AT is singular modulo p
+    '''
+    dim = len(AT)
+
+    if np is not None:
+        augmented = np.zeros((dim, dim + 1), dtype=np.int64)
+        augmented[:, :dim] = [ [ x % p for x in row ] for row in AT ]
+        augmented[0, dim] = 1
+
+        # 1) Forward elimination, with the pivot rows scaled to 1.
+        # Below the pivot rows, entries are only reduced every few steps: 
+        # each update adds less than p^2, so they stay below 2^62 in between.
+        reduce_every = max(1, 2**62 // (p * p) - 1)
+        for k in range(dim):
+            if k % reduce_every == 0:
+                augmented[k:, k:] %= p
+            column = augmented[k:, k] % p
+            nonzero = np.flatnonzero(column)
+            if len(nonzero) == 0:
+                return None
+            r = k + nonzero[0]
+            if r != k:
+                augmented[[k, r]] = augmented[[r, k]]
+                column[[0, r - k]] = column[[r - k, 0]]
+            inverse_pivot = pow(int(column[0]), p - 2, p)
+            pivot_row = augmented[k, k:] % p * inverse_pivot % p
+            augmented[k, k:] = pivot_row
+            augmented[k+1:, k+1:] -= np.outer(column[1:], pivot_row[1:])
+
+        # 2) Back substitution, one column at a time
+        rhs = augmented[:, dim].copy()
+        for r in reversed(range(dim)):
+            rhs[:r] -= augmented[:r, r] * rhs[r] % p
+            rhs[:r] %= p
+        return [ int(x) for x in rhs ]
+
+    augmented = [ [ x % p for x in row ] + [1 if r == 0 else 0] for r, row in enumerate(AT) ]
+    for k in range(dim):
+        for r in range(k, dim):
+            if augmented[r][k] != 0:
+                break
+        else:
+            return None
+        augmented[k], augmented[r] = augmented[r], augmented[k]
+        inverse_pivot = pow(augmented[k][k], p - 2, p)
+        pivot_row = [ x * inverse_pivot % p for x in augmented[k] ]
+        augmented[k] = pivot_row
+        for r in range(k+1, dim):
+            ratio = augmented[r][k]
+            if ratio != 0:
+                row = augmented[r]
+                for c in range(k, dim + 1):
+                    row[c] = (row[c] - ratio * pivot_row[c]) % p
+
+    z = [0] * dim
+    for r in reversed(range(dim)):
+        row = augmented[r]
+        z[r] = (row[dim] - sum(row[c] * z[c] for c in range(r+1, dim))) % p
+    return z
+
+def _solve_mod_prime_args (args):
+    # Process pools hand over a single argument
+    return solve_mod_prime(*args)
+
+def rational_reconstruction (u, modulus):
+    '''
+    Find a/b = u (mod modulus) with |a|, b <= sqrt(modulus/2)
+    Returns (a, b), or None if there is no such fraction
+    '''
+    bound = isqrt(modulus // 2)
+    r0, r1 = modulus, u % modulus
+    t0, t1 = 0, 1
+    while r1 > bound:
+        q = r0 // r1
+        r0, r1 = r1, r0 - q * r1
+        t0, t1 = t1, t0 - q * t1
+    if t1 == 0 or abs(t1) > bound:
+        return None
+    if t1 < 0:
+        r1, t1 = -r1, -t1
+    return r1, t1
+
+def isqrt (n):
+    # Integer square root with Newton's method
+    if n < 2:
+        return n
+    x = 1 << ((n.bit_length() + 1) // 2)
+    while True:
+        y = (x + n // x) // 2
+        if y >= x:
+            return x
+        x = y
+
+def hadamard_bits (A):
+    '''
+    log2 of the Hadamard bound on |det(A)|, rounded up
+    '''
+    bits = 0
+    for row in A:
+        bits += (sum(x * x for x in row).bit_length() + 1) // 2
+    return bits
+
+def reconstruct_vector (residues, modulus):
+    '''
+    Rebuild a vector of fractions from residues modulo modulus, with a common denominator.
+    Returns (numerators, denominator), or None if some entry can't be reconstructed yet.
+    '''
+    bound = isqrt(modulus // 2)
+    denominator = 1
+    for u in residues:
+        # Most entries share the denominator found so far
+        v = u * denominator % modulus
+        if v > modulus // 2:
+            v -= modulus
+        if abs(v) <= bound:
+            continue
+        fraction = rational_reconstruction(v, modulus)
+        if fraction is None:
+            return None
+        denominator *= fraction[1]
+        if denominator > bound:
+            return None
+
+    numerators = []
+    for u in residues:
+        v = u * denominator % modulus
+        if v > modulus // 2:
+            v -= modulus
+        numerators.append(v)
+    return numerators, denominator
+
+def answer_multimodular (m, workers=1):
+    transient_index, absorbing_index = get_state_indices(m)
+
+    if len(transient_index) == 0 or transient_index[0] != 0:
+        # The ore starts in an absorbing state and stays there
+        return absorbed_answer(absorbing_index)
+
+    A, C = get_count_system(m, transient_index, absorbing_index)
+    AT = [ list(col) for col in zip(*A) ]
+    dim = len(AT)
+
+    # z = adj(AT) * e_0 / det, and both det and adj(AT) are within the Hadamard bound,
+    # so these many primes always do. Most chains need a lot less.
+    most_primes = (2 * hadamard_bits(A) + 1) // (PRIME_LIMIT.bit_length() - 2) + 1
+    batch = min(max(4, workers), most_primes)
+    below = PRIME_LIMIT
+
+    pool = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(workers)
+
+    try:
+        residues = [0] * dim
+        modulus = 1
+        used = 0
+        while True:
+            primes = get_word_primes(batch, below=below)
+            below = primes[-1]
+            used += batch
+            if pool is not None:
+                solutions = pool.map(_solve_mod_prime_args, [ (AT, p) for p in primes ],
+                        chunksize=max(1, len(primes) // (4 * workers)))
+            else:
+                solutions = [ solve_mod_prime(AT, p) for p in primes ]
+
+            # Chinese remainder theorem, one prime at a time
+            for p, z in zip(primes, solutions):
+                if z is None:
+                    # p divides det(A), skip it
+                    continue
+                inverse_modulus = pow(modulus % p, p - 2, p)
+                for i in range(dim):
+                    residues[i] += modulus * ((z[i] - residues[i]) * inverse_modulus % p)
+                modulus *= p
+
+            reconstructed = reconstruct_vector(residues, modulus)
+            if reconstructed is not None:
+                numerators, denominator = reconstructed
+                # Verify AT * numerators == denominator * e_0 exactly
+                for r in range(dim):
+                    total = sum(AT[r][c] * numerators[c] for c in range(dim) if AT[r][c])
+                    if total != (denominator if r == 0 else 0):
+                        break
+                else:
+                    break
+
+            # Not enough primes yet, double them, but no need to go past the Hadamard bound
+            batch = max(min(used, most_primes - used), 1)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    prob = []
+    for col in range(len(absorbing_index)):
+        prob.append(sum(numerators[t] * C[t][col] for t in range(dim) if C[t][col]))
+    return reduce_answer(prob, denominator)
+
+
+'''
+Floating point
+
+Plenty of callers only need the probabilities to ~1e-12, and LAPACK is much faster than anything above. 
+The error of the float solution is bounded by roughly cond(I - Q) * machine epsilon, 
+so we hand back that estimate together with the probabilities.
+
+There's no need to invert I - Q for either: row 0 of F solves (I - Q)^T * v = e_0, and since 
+F = I + Q + Q^2 + ... has no negative entries, its 1-norm is the largest entry of 1 * F, 
+which solves (I - Q)^T * w = 1. Both come out of one solve() with two right hand sides.
+
+When exact output is asked for, the expected visits v = row 0 of F are rounded to the nearest 
+fractions with a bounded denominator. We can check those exactly, since v must satisfy
+    v(j) - sum of v(i) * Q(i,j) = 1 if j == 0 else 0
+for every transient state j. If it holds, v * R is the exact answer. Otherwise the rounding 
+wasn't good enough and we fall back to answer_sparse().
+'''
+
+def answer_float (m, exact=False, max_denominator=2**31 - 1):
+    '''
+    Without exact: returns (probabilities of each terminal state, error estimate)
+    With exact: returns the same as answer(m)
+    '''
+    if np is None:
+        raise ImportError('answer_float() needs NumPy')
+
+    transient_index, absorbing_index = get_state_indices(m)
+
+    if len(transient_index) == 0 or transient_index[0] != 0:
+        # The ore starts in an absorbing state and stays there
+        if exact:
+            return absorbed_answer(absorbing_index)
+        return [ 1.0 if i == 0 else 0.0 for i in absorbing_index ], 0.0
+
+    counts = np.array(m, dtype=np.float64)
+    totals = counts[transient_index].sum(axis=1)
+    Q = counts[np.ix_(transient_index, transient_index)] / totals[:, None]
+    R = counts[np.ix_(transient_index, absorbing_index)] / totals[:, None]
+
+    # Row 0 of F and the column sums of F, from one factorization of (I - Q)^T
+    I_Q = np.eye(len(transient_index)) - Q
+    rhs = np.zeros((len(transient_index), 2))
+    rhs[0, 0] = 1
+    rhs[:, 1] = 1
+    solution = np.linalg.solve(I_Q.T, rhs)
+    visits = solution[:, 0]
+    # F has no negative entries, so its 1-norm (largest column sum) is the largest entry of 1 * F
+    condition = np.abs(I_Q).sum(axis=0).max() * solution[:, 1].max()
+    prob = visits.dot(R)
+
+    if not exact:
+        return prob.tolist(), float(condition * np.finfo(np.float64).eps)
+
+    # Round the expected visits, then verify them exactly
+    v = [ Fraction(float(x)).limit_denominator(max_denominator) for x in visits ]
+    totals = [ sum(m[i]) for i in transient_index ]
+    for col, j in enumerate(transient_index):
+        inflow = sum(v[row] * m[i][j] / totals[row] for row, i in enumerate(transient_index) if m[i][j])
+        if v[col] - inflow != (1 if j == 0 else 0):
+            return answer_sparse(to_sparse(m))
+
+    prob = []
+    for j in absorbing_index:
+        prob.append(sum(v[row] * Fraction(m[i][j], totals[row]) for row, i in enumerate(transient_index) if m[i][j]))
+    return fraction_answer(prob)
+
+
+'''
+Live updates
+
+When one more transition from src to dst is observed, only row src of Q changes:
+    Q'(src) = (counts(src) + count * e_dst) / (s + count)
+so I - Q' = (I - Q) - e_src * d^T, where d = Q'(src) - Q(src) over the transient states. 
+That's a rank-one change, and Sherman-Morrison gives the new fundamental matrix from the old one:
+    F' = F + (F * e_src) * (d^T * F) / (1 - d^T * F * e_src)
+which is O(t^2) instead of a new O(t^3) inverse. 
+The only time this doesn't work is when an absorbing state sees its first transition and becomes transient. 
+Then the shape of F changes and we rebuild it.
+'''
+
+class AbsorbingChain(object):
+    '''
+    An absorbing chain that keeps its fundamental matrix up to date as transitions are observed
+    '''
+
+    def __init__ (self, m):
+        self.counts = [ list(row) for row in m ]
+        self.rebuild()
+
+    def rebuild (self):
+        self.transient_index, self.absorbing_index = get_state_indices(self.counts)
+        self.position = dict((state, i) for i, state in enumerate(self.transient_index))
+        self.totals = [ sum(row) for row in self.counts ]
+
+        # F = A^-1 * S, where A = s*I - counts and S is the diagonal of row sums
+        A, C = get_count_system(self.counts, self.transient_index, self.absorbing_index)
+        S = [ [ self.totals[i] if i == j else 0 for j in self.transient_index ] for i in self.transient_index ]
+        det, X = bareiss_solve(A, S)
+        self.F = [ [ Fraction(x, det) for x in row ] for row in X ]
+
+    def observe (self, src, dst, count=1):
+        '''
+        Record count more transitions from src to dst
+        '''
+        if count <= 0:
+            raise ValueError('count must be positive')
+
+        if src not in self.position:
+            # An absorbing state becomes transient
+            self.counts[src][dst] += count
+            self.rebuild()
+            return
+
+        # d = Q'(src) - Q(src) over the transient states
+        row = self.counts[src]
+        total = self.totals[src]
+        d = []
+        for col, j in enumerate(self.transient_index):
+            new = row[j] + (count if j == dst else 0)
+            if new or row[j]:
+                d.append((col, Fraction(new, total + count) - Fraction(row[j], total)))
+
+        row[dst] += count
+        self.totals[src] += count
+
+        dim = len(self.transient_index)
+        F = self.F
+        src_col = self.position[src]
+        Fu = [ F[r][src_col] for r in range(dim) ]
+        dF = [ sum(delta * F[col][c] for col, delta in d) for c in range(dim) ]
+        denominator = 1 - sum(delta * Fu[col] for col, delta in d)
+        for r in range(dim):
+            if Fu[r]:
+                scale = Fu[r] / denominator
+                F_r = F[r]
+                for c in range(dim):
+                    if dF[c]:
+                        F_r[c] += scale * dF[c]
+
+    def answer (self, start=0):
+        '''
+        Terminal state probabilities from start, in the answer() format
+        '''
+        if start not in self.position:
+            return absorbed_answer(self.absorbing_index, start)
+
+        F0 = self.F[self.position[start]]
+        prob = []
+        for j in self.absorbing_index:
+            result = Fraction(0)
+            for t, i in enumerate(self.transient_index):
+                if self.counts[i][j]:
+                    result += F0[t] * Fraction(self.counts[i][j], self.totals[i])
+            prob.append(result)
+        return fraction_answer(prob)
+
+
+'''
+Time to absorption
+
+The fundamental matrix F = (I - Q)^-1 gives more than the terminal distribution:
+    - F(s,j) is the expected number of visits to transient state j when starting in s
+    - tau = F * 1 is the expected number of steps before absorption
+    - (2F - I) * tau - tau^2 is the variance of that number of steps
+From a single start state s, we need row s of F, which is the transposed solve of 
+absorption_probabilities(), and for the variance:
+    variance(s) = 2 * (row s of F) . tau - tau(s) - tau(s)^2
+tau(s) is just the sum of row s of F. The dot product doesn't need the whole tau vector either:
+with A = s*I - counts, F = A^-1 * S, so with v = row s of F
+    v . tau = v . A^-1 * S * 1 = u . (row sums)    where transpose(A) * u = v
+which is one more solve with transpose(A), and its factorization is already there.
+'''
+
+def chain_statistics (m, start=0, chain=None):
+    '''
+    Returns a dict with
+        answer: same as answer(m), but from start
+        expected_visits: {transient state: expected number of visits}
+        expected_steps: expected number of steps before absorption
+        variance: variance of the number of steps before absorption
+    chain can be a factor_chain(m) result to reuse across calls
+    '''
+    if chain is None:
+        chain = factor_chain(m)
+    transient_index, absorbing_index, C, factor = chain
+    position = dict((state, i) for i, state in enumerate(transient_index))
+    dim = len(transient_index)
+
+    if start not in position:
+        return {
+            'answer': absorbed_answer(absorbing_index, start),
+            'expected_visits': {},
+            'expected_steps': Fraction(0),
+            'variance': Fraction(0),
+        }
+
+    totals = [ sum(m[i]) for i in transient_index ]
+
+    # 1) Row start of F, from the factorization of transpose(A)
+    e = [ [0] for i in range(dim) ]
+    e[position[start]][0] = 1
+    det, z = bareiss_solve_factored(factor, e)
+    numerators = []
+    for col in range(len(absorbing_index)):
+        numerators.append(sum(z[t][0] * C[t][col] for t in range(dim) if C[t][col]))
+    visits = [ Fraction(z[t][0] * totals[t], det) for t in range(dim) ]
+    steps = Fraction(sum(z[t][0] * totals[t] for t in range(dim)), det)
+
+    # 2) (row start of F) . tau, with the same factorization: transpose(A) * u = visits
+    # det * visits are integers, so u = U / det^2
+    det_u, U = bareiss_solve_factored(factor, [ [z[t][0] * totals[t]] for t in range(dim) ])
+    visits_tau = Fraction(sum(U[t][0] * totals[t] for t in range(dim)), det_u * det)
+
+    return {
+        'answer': reduce_answer(numerators, det),
+        'expected_visits': dict(zip(transient_index, visits)),
+        'expected_steps': steps,
+        'variance': 2 * visits_tau - steps - steps * steps,
+    }
+
+
+'''
+Caching repeated chains
+
+A lot of matrices are the same chain in disguise: the states are numbered differently, 
+or every count in a row is multiplied by the same number. Neither changes the answer 
+(up to the order of the terminal states), so we look them up under a canonical form:
+    - each row is divided by the gcd of its counts
+    - states are renumbered in the order a breadth-first walk from state 0 finds them, 
+      visiting the next states by decreasing count, then by their own (sorted) row of counts.
+      The original number only breaks the remaining ties.
+    - states that can't be reached from state 0 are dropped. Unreachable terminal states get 0 anyway.
+Two matrices with the same canonical form always have the same answer. Some relabelings of 
+very symmetric chains won't be recognized, which only costs a miss.
+'''
+
+class AnswerCache(object):
+    '''
+    LRU cache of answers, keyed on the canonical form of the matrix
+    '''
+
+    def __init__ (self, maxsize=1024, max_bytes=None, solver=None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.solver = solver if solver is not None else answer_single
+        self.entries = OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def info (self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'bytes': self.size_bytes,
+        }
+
+    def clear (self):
+        self.entries.clear()
+        self.size_bytes = 0
+
+    def answer (self, m):
+        key, absorbing_order = canonicalize(m)
+
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            result = self.entries[key][0]
+        else:
+            self.misses += 1
+            result = self.solver(canonical_matrix(key))
+            size = entry_size(key, result)
+            self.entries[key] = (result, size)
+            self.size_bytes += size
+            while len(self.entries) > self.maxsize or \
+                    (self.max_bytes is not None and self.size_bytes > self.max_bytes and len(self.entries) > 1):
+                evicted = self.entries.popitem(last=False)[1]
+                self.size_bytes -= evicted[1]
+                self.evictions += 1
+
+        # Back to the caller's numbering
+        numerators = dict(zip(absorbing_order, result[:-1]))
+        return [ numerators.get(i, 0) for i in range(len(m)) if sum(m[i]) == 0 ] + [result[-1]]
+
+def canonicalize (m):
+    '''
+    Returns (key, absorbing_order): the canonical form of m as a hashable tuple,
+    and the original number of each reachable terminal state in canonical order
+    '''
+    rows = []
+    for row in m:
+        common = reduce(gcd, row, 0)
+        rows.append([ x // common for x in row ] if common else list(row))
+
+    def signature (state):
+        return tuple(sorted((x for x in rows[state] if x), reverse=True))
+
+    label = {0: 0}
+    order = [0]
+    queue = deque([0])
+    while queue:
+        state = queue.popleft()
+        next_states = [ j for j, count in enumerate(rows[state]) if count and j not in label ]
+        next_states.sort(key=lambda j: (-rows[state][j], signature(j), j))
+        for j in next_states:
+            label[j] = len(order)
+            order.append(j)
+            queue.append(j)
+
+    key = tuple(
+        tuple(sorted((label[j], count) for j, count in enumerate(rows[state]) if count))
+        for state in order)
+    absorbing_order = [ state for state in order if not key[label[state]] ]
+    return key, absorbing_order
+
+def canonical_matrix (key):
+    '''
+    The matrix of counts described by a canonicalize() key
+    '''
+    dim = len(key)
+    matrix = [ [0] * dim for i in range(dim) ]
+    for i, row in enumerate(key):
+        for j, count in row:
+            matrix[i][j] = count
+    return matrix
+
+def entry_size (key, result):
+    # Rough number of bytes held by a cache entry
+    size = sys.getsizeof(key) + sys.getsizeof(result)
+    for row in key:
+        size += sys.getsizeof(row)
+        for pair in row:
+            size += sys.getsizeof(pair) + sys.getsizeof(pair[1])
+    for x in result:
+        size += sys.getsizeof(x)
+    return size
+
+cache = AnswerCache()
+
+def answer_cached (m):
+    return cache.answer(m)
+
+
+'''
+Batches
+
+Solving millions of small matrices one after another only uses one core. 
+We cut the stream of matrices into chunks and hand the chunks to a process pool, 
+so the cost of pickling is paid per chunk rather than per matrix. Only a few chunks are 
+in flight at a time, so the input can be a generator that never fits in memory.
+'''
+
+def solve_chunk (args):
+    '''
+    Solve one chunk of matrices, returns (answers, seconds spent)
+    '''
+    solver, chunk = args
+    started = time.time()
+    answers = [ solver(m) for m in chunk ]
+    return answers, time.time() - started
+
+def answer_batch (matrices, workers=None, chunksize=256, ordered=True, solver=None, report=None):
+    '''
+    Yield the answer of every matrix in matrices.
+    With ordered=False, answers come in the order the chunks finish, as (index, answer) pairs.
+    report, if given, is called after every chunk with a dict of
+    batch (chunk number), matrices, seconds and rate (matrices per second).
+    solver must be a module level function so it can be pickled.
+    '''
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+    if solver is None:
+        solver = answer_single
+    matrices = iter(matrices)
+
+    def chunks ():
+        start = 0
+        while True:
+            chunk = list(islice(matrices, chunksize))
+            if not chunk:
+                return
+            yield start, chunk
+            start += len(chunk)
+
+    def finished (batch, chunk, result):
+        answers, seconds = result
+        if report is not None:
+            report({
+                'batch': batch,
+                'matrices': len(chunk),
+                'seconds': seconds,
+                'rate': len(chunk) / seconds if seconds else float('inf'),
+            })
+        return answers
+
+    if workers == 1:
+        for batch, (start, chunk) in enumerate(chunks()):
+            answers = finished(batch, chunk, solve_chunk((solver, chunk)))
+            for i, result in enumerate(answers):
+                yield result if ordered else (start + i, result)
+        return
+
+    with ProcessPoolExecutor(workers) as pool:
+        in_flight = 2 * (workers or os.cpu_count() or 1)
+        pending = deque()
+
+        def collect ():
+            # Answers of the next chunk, or of whichever chunks are done
+            if ordered:
+                done = [ pending.popleft() ]
+            else:
+                wait([ entry[0] for entry in pending ], return_when=FIRST_COMPLETED)
+                done = [ entry for entry in pending if entry[0].done() ]
+                for entry in done:
+                    pending.remove(entry)
+            for future, batch, start, chunk in done:
+                for i, result in enumerate(finished(batch, chunk, future.result())):
+                    yield result if ordered else (start + i, result)
+
+        for batch, (start, chunk) in enumerate(chunks()):
+            pending.append((pool.submit(solve_chunk, (solver, chunk)), batch, start, chunk))
+            if len(pending) >= in_flight:
+                for result in collect():
+                    yield result
+
+        while pending:
+            for result in collect():
+                yield result
+
+
+'''
+Monte Carlo
+
+When a chain is too big for any exact solve, we can just follow the ore around. 
+Many random walks start at state 0 and step together as one NumPy array: each state has a 
+table of cumulative probabilities, and a uniform number between 0 and 1 picks the next state from it.
+All the tables live in one sorted array, with state i's table shifted up by i, so one 
+searchsorted() call moves every walker at once. The shift costs some precision for big i, 
+and i + u can round up to i + 1, so the picks are clamped to the end of each walker's own table.
+
+The fraction of walks ending in each terminal state estimates its probability. 
+We keep adding batches of walks until the Wilson score interval of every estimate is 
+narrower than the requested precision.
+
+A walk still going after max_steps steps can't just be left out: the slow walks are the ones 
+going to the hard to reach states, so dropping them skews the estimate towards the states reached quickly. 
+Every walk that was started counts, and the unfinished ones could still end up anywhere, so for each terminal state
+    - the low end of the interval counts them as landing somewhere else
+    - the high end counts them all as landing there
+and the estimate splits them evenly between the terminal states. 
+With many unfinished walks the intervals stay wide, and the loop doesn't stop on a precise looking wrong value.
+'''
+
+def wilson_interval (hits, n, z):
+    '''
+    Wilson score interval of hits successes out of n trials, for an array of hits
+    '''
+    if n == 0:
+        return np.zeros(len(hits)), np.ones(len(hits))
+    p = hits / float(n)
+    center = (p + z * z / (2 * n)) / (1 + z * z / n)
+    half_width = z * np.sqrt(p * (1 - p) / n + z * z / (4.0 * n * n)) / (1 + z * z / n)
+    return np.clip(center - half_width, 0, 1), np.clip(center + half_width, 0, 1)
+
+def estimate_answer (m, precision=1e-3, z=1.96, batch_size=100000, max_walks=10**8, max_steps=10**6, seed=None):
+    '''
+    m is either a matrix of counts or a to_sparse() list of rows.
+    Returns a dict with
+        probabilities: estimated probability of each terminal state, in the answer() order
+        intervals: (low, high) confidence interval of each probability, wide enough for the unfinished walks
+        walks: number of walks that were absorbed
+        unfinished: number of walks still going after max_steps steps
+    '''
+    if np is None:
+        raise ImportError('estimate_answer() needs NumPy')
+
+    graph = m if len(m) and isinstance(m[0], dict) else to_sparse(m)
+    dim = len(graph)
+    totals = [ sum(row.values()) for row in graph ]
+    absorbing_index = [ i for i in range(dim) if totals[i] == 0 ]
+    is_absorbing = np.array([ total == 0 for total in totals ])
+
+    if totals[0] == 0:
+        # The ore starts in an absorbing state and stays there
+        return {
+            'probabilities': [ 1.0 if i == 0 else 0.0 for i in absorbing_index ],
+            'intervals': [ (1.0, 1.0) if i == 0 else (0.0, 0.0) for i in absorbing_index ],
+            'walks': 0,
+            'unfinished': 0,
+        }
+
+    # Cumulative probability tables of all states, state i shifted up by i.
+    # row_end[i] is where state i's table ends in keys
+    keys = []
+    targets = []
+    row_end = []
+    for i, row in enumerate(graph):
+        cumulative = 0
+        for j, count in sorted(row.items()):
+            if count:
+                cumulative += count
+                keys.append(i + float(cumulative) / totals[i])
+                targets.append(j)
+        row_end.append(len(keys))
+    keys = np.array(keys)
+    targets = np.array(targets, dtype=np.int64)
+    row_end = np.array(row_end, dtype=np.int64)
+
+    random = np.random.default_rng(seed)
+    hits = np.zeros(dim, dtype=np.int64)
+    started = 0
+    walks = 0
+    unfinished = 0
+    # Nothing is known before the first walk
+    p = np.full(len(absorbing_index), 1.0 / len(absorbing_index))
+    low, high = wilson_interval(p, 0, z)
+    while started < max_walks:
+        position = np.zeros(min(batch_size, max_walks - started), dtype=np.int64)
+        started += len(position)
+        for step in range(max_steps):
+            picks = np.searchsorted(keys, position + random.random(len(position)), side='right')
+            # For a big i, i + u rounds up to i + 1 when u is close to 1, which is past the end of state i's table
+            picks = np.minimum(picks, row_end[position] - 1)
+            position = targets[picks]
+            done = is_absorbing[position]
+            if done.any():
+                hits += np.bincount(position[done], minlength=dim)
+                walks += int(done.sum())
+                position = position[~done]
+                if len(position) == 0:
+                    break
+        unfinished += len(position)
+
+        # Wilson score interval of every terminal state, the unfinished walks count against the low end
+        # and for the high end
+        n = walks + unfinished
+        found = hits[absorbing_index]
+        p = (found + float(unfinished) / len(absorbing_index)) / n
+        low, _ = wilson_interval(found, n, z)
+        _, high = wilson_interval(found + unfinished, n, z)
+        if (high - low).max() <= 2 * precision:
+            break
+
+    return {
+        'probabilities': p.tolist(),
+        'intervals': list(zip(low.tolist(), high.tolist())),
+        'walks': walks,
+        'unfinished': unfinished,
+    }
+
 '''
 #Testing
 dim = int(input())
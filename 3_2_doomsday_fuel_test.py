@@ -0,0 +1,230 @@
+'''
+Checks for 3_2_doomsday_fuel.py: every engine against answer(), on the examples and random chains.
+'''
+
+import random
+
+from challenge_loader import load, skip_without_numpy
+
+fuel = load('3_2_doomsday_fuel')
+
+EXAMPLES = [
+    ([[0, 2, 1, 0, 0], [0, 0, 0, 3, 4], [0, 0, 0, 0, 0], [0, 0, 0, 0, 0], [0, 0, 0, 0, 0]], [7, 6, 8, 21]),
+    ([[0, 1, 0, 0, 0, 1], [4, 0, 0, 3, 2, 0], [0, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 0]],
+        [0, 3, 2, 9, 14]),
+]
+
+def random_chain(dim, rng, density=0.4, max_count=9):
+    '''
+    A chain where every state can reach a terminal state, like the challenge promises
+    '''
+    terminals = rng.randint(1, max(1, dim // 3))
+    m = [ [0] * dim for _ in range(dim) ]
+    for i in range(dim - terminals):
+        for j in range(dim):
+            if rng.random() < density:
+                m[i][j] = rng.randint(1, max_count)
+        # Always a way forward, so nothing is stuck in a loop forever
+        m[i][rng.randint(i + 1, dim - 1)] += 1
+    return m
+
+def random_chains(count, max_dim=9, seed=0):
+    rng = random.Random(seed)
+    return [ random_chain(rng.randint(2, max_dim), rng) for _ in range(count) ]
+
+def test_examples():
+    for m, expected in EXAMPLES:
+        assert fuel.answer(m) == expected
+
+def ring(size, leak_every=7):
+    '''
+    One big cycle going both ways, leaking into two terminal states now and then
+    '''
+    graph = [ dict() for _ in range(size + 2) ]
+    for i in range(size):
+        graph[i][(i + 1) % size] = 3
+        graph[i][(i - 1) % size] = 2
+        if i % leak_every == 0:
+            graph[i][size + (i // leak_every) % 2] = 1
+    return graph
+
+def permuted(m, rng):
+    # The same chain with states 1.. renumbered and every row scaled
+    dim = len(m)
+    order = [0] + rng.sample(range(1, dim), dim - 1)
+    scales = [ rng.randint(1, 4) for _ in range(dim) ]
+    return [ [ m[i][j] * scales[i] for j in order ] for i in order ]
+
+def test_answer_bareiss():
+    for m in random_chains(150, max_dim=10, seed=5):
+        assert fuel.answer_bareiss(m) == fuel.answer(m)
+
+def test_absorption_probabilities():
+    for m in random_chains(100, max_dim=10, seed=9):
+        assert fuel.answer_single(m) == fuel.answer(m)
+
+        # Every start state against the chain with that state moved to 0
+        chain = fuel.factor_chain(m)
+        results = fuel.absorption_probabilities(m, range(len(m)), chain=chain)
+        for start in range(1, len(m)):
+            if sum(m[start]) == 0:
+                continue
+            order = [start] + [ i for i in range(len(m)) if i != start ]
+            moved = [ [ m[i][j] for j in order ] for i in order ]
+            terminals = [ i for i in order if sum(m[i]) == 0 ]
+            numerators = dict(zip(terminals, fuel.answer(moved)[:-1]))
+            expected_start = [ numerators[i] for i in range(len(m)) if sum(m[i]) == 0 ] + [fuel.answer(moved)[-1]]
+            assert results[start] == expected_start
+
+def test_answer_float():
+    skip_without_numpy(fuel)
+    for m in random_chains(150, max_dim=10, seed=10):
+        expected = fuel.answer(m)
+        assert fuel.answer_float(m, exact=True) == expected
+        probabilities, error = fuel.answer_float(m)
+        assert type(error) is float and all(type(p) is float for p in probabilities)
+        for p, numerator in zip(probabilities, expected):
+            assert abs(p - float(numerator) / expected[-1]) <= max(error, 1e-12) * 10
+
+        # The error estimate is cond(I - Q) * eps, without inverting I - Q
+        np = fuel.np
+        transient_index, _ = fuel.get_state_indices(m)
+        if transient_index and transient_index[0] == 0:
+            counts = np.array(m, dtype=np.float64)[transient_index]
+            Q = counts[:, transient_index] / counts.sum(axis=1)[:, None]
+            I_Q = np.eye(len(transient_index)) - Q
+            condition = np.linalg.cond(I_Q, 1) * np.finfo(np.float64).eps
+            assert abs(error - condition) <= 1e-6 * condition
+
+def test_absorbing_chain():
+    rng = random.Random(6)
+    for m in random_chains(20, max_dim=7, seed=6):
+        chain = fuel.AbsorbingChain(m)
+        counts = [ list(row) for row in m ]
+        for _ in range(5):
+            src = rng.randrange(len(m))
+            dst = rng.randrange(len(m))
+            count = rng.randint(1, 3)
+            counts[src][dst] += count
+            try:
+                expected = fuel.answer_bareiss(counts)
+            except ValueError:
+                # The new transition makes a loop with no way out, which isn't an absorbing chain anymore
+                counts[src][dst] -= count
+                continue
+            chain.observe(src, dst, count)
+            assert chain.answer() == expected
+
+def test_answer_cached():
+    rng = random.Random(7)
+    cache = fuel.AnswerCache(maxsize=1000)
+    chains = random_chains(50, max_dim=9, seed=7)
+    for m in chains:
+        assert cache.answer(m) == fuel.answer(m)
+    hits = cache.info()['hits']
+    for m in chains:
+        same = permuted(m, rng)
+        assert cache.answer(same) == fuel.answer(same)
+    # Ties between states are broken by their number, so a few relabelings are missed
+    assert cache.info()['hits'] - hits >= 0.8 * len(chains)
+
+def test_answer_batch():
+    matrices = random_chains(60, max_dim=8, seed=8)
+    expected = [ fuel.answer(m) for m in matrices ]
+    assert list(fuel.answer_batch(matrices, workers=2, chunksize=7)) == expected
+    unordered = dict(fuel.answer_batch(iter(matrices), workers=2, chunksize=5, ordered=False))
+    assert [ unordered[i] for i in range(len(matrices)) ] == expected
+
+def test_answer_sparse():
+    for m in random_chains(200, max_dim=12):
+        assert fuel.answer_sparse(fuel.to_sparse(m)) == fuel.answer(m)
+
+    # Above DENSE_COMPONENT, so it goes through solve_sparse_system()
+    graph = ring(fuel.DENSE_COMPONENT + 20)
+    m = [ [ row.get(j, 0) for j in range(len(graph)) ] for row in graph ]
+    assert fuel.answer_sparse(graph) == fuel.answer_bareiss(m)
+
+def test_answer_multimodular():
+    for m in random_chains(100, max_dim=12, seed=2):
+        assert fuel.answer_multimodular(m) == fuel.answer(m)
+
+    # Enough states for several rounds of doubling the primes
+    m = random_chain(40, random.Random(3), density=0.3)
+    assert fuel.answer_multimodular(m) == fuel.answer_bareiss(m)
+
+    # Without NumPy
+    np, fuel.np = fuel.np, None
+    try:
+        for m in random_chains(30, max_dim=10, seed=4):
+            assert fuel.answer_multimodular(m) == fuel.answer(m)
+    finally:
+        fuel.np = np
+
+def test_chain_statistics():
+    for m in random_chains(60, max_dim=8, seed=1):
+        transient_index, absorbing_index = fuel.get_state_indices(m)
+        dim = len(transient_index)
+        Q = [ row[:dim] for row in fuel.organize(m)[:dim] ]
+        F = fuel.get_fundamental_matrix(Q)
+        tau = [ sum(row) for row in F ]
+        chain = fuel.factor_chain(m)
+        for t, start in enumerate(transient_index):
+            stats = fuel.chain_statistics(m, start, chain=chain)
+            assert stats['answer'] == fuel.absorption_probabilities(m, [start], chain=chain)[0]
+            assert stats['expected_visits'] == dict(zip(transient_index, F[t]))
+            assert stats['expected_steps'] == tau[t]
+            second_moment = 2 * sum(F[t][j] * tau[j] for j in range(dim)) - tau[t]
+            assert stats['variance'] == second_moment - tau[t] ** 2
+
+def test_estimate_answer():
+    skip_without_numpy(fuel)
+    for m, expected in EXAMPLES:
+        result = fuel.estimate_answer(m, precision=5e-3, seed=1)
+        for p, (low, high), numerator in zip(result['probabilities'], result['intervals'], expected):
+            assert low <= float(numerator) / expected[-1] <= high
+
+    # Slow walks must not be dropped: the exact answer is 1/2, 1/2
+    slow = [[0, 1, 1, 0], [0, 999, 0, 1], [0] * 4, [0] * 4]
+    assert fuel.answer(slow) == [1, 1, 2]
+    result = fuel.estimate_answer(slow, max_steps=1000, max_walks=100000, seed=1)
+    assert result['unfinished'] > 0
+    for low, high in result['intervals']:
+        assert low <= 0.5 <= high
+
+    result = fuel.estimate_answer(slow, max_walks=0)
+    assert result['walks'] == 0 and result['intervals'] == [(0.0, 1.0), (0.0, 1.0)]
+
+class AlmostOne(object):
+    # Stands in for the NumPy generator, and only draws numbers just below 1
+    def random(self, size):
+        return fuel.np.full(size, 1 - 2.0 ** -40)
+
+def test_estimate_answer_rounding():
+    skip_without_numpy(fuel)
+    # State big's table ends at big + 1.0, and big + u rounds to it.
+    # big is the last state with transitions, so a pick past its table would be out of range
+    big = 2 ** 20
+    graph = [{big: 1}] + [{}] * (big - 1) + [{1: 1, big + 1: 1}, {}]
+    default_rng = fuel.np.random.default_rng
+    fuel.np.random.default_rng = lambda seed: AlmostOne()
+    try:
+        result = fuel.estimate_answer(graph, batch_size=10, max_walks=10)
+    finally:
+        fuel.np.random.default_rng = default_rng
+    assert result['walks'] == 10 and result['probabilities'][-1] == 1.0
+
+if __name__ == '__main__':
+    test_examples()
+    test_answer_bareiss()
+    test_absorption_probabilities()
+    if fuel.np is not None:
+        test_answer_float()
+    test_absorbing_chain()
+    test_answer_cached()
+    test_answer_batch()
+    test_answer_sparse()
+    test_answer_multimodular()
+    test_chain_statistics()
+    if fuel.np is not None:
+        test_estimate_answer()
+        test_estimate_answer_rounding()
@@ -102,6 +102,12 @@ http://graphics.stanford.edu/~seander/bithacks.html#ZerosOnRightLinear
 
 '''
 
+from collections import OrderedDict
+from functools import reduce
+import heapq
+
+from number_input import is_bytes, iter_numbers, to_int
+
 def count_trailing_zeros_in_binary(n):
     # http://graphics.stanford.edu/~seander/bithacks.html#ZerosOnRightLinear
     # Exclusive OR on n and (n-1)
@@ -119,8 +125,9 @@ def count_trailing_zeros_in_binary(n):
 
     return counter
 
-def answer(n):
-    n = int(n)
+def answer(n, byteorder=None):
+    # n can be an int, a decimal or 0x hex string (or bytes), or bytes in binary with their byteorder
+    n = to_int(n, byteorder)
 
     counter = 0
     while n > 3:
@@ -153,3 +160,482 @@ def answer(n):
     else:
         # n==3
         return counter+2
+
+'''
+Linear time for huge numbers
+
+answer() looks at the whole number for every single operation: n+1, n-1, n>>1 and the trailing zero 
+counts all copy or scan the full bigint. With a million bits, that's quadratic.
+
+But the rule above only ever looks at the last two bits:
+    - ends with 0: halve
+    - ends with 01: subtract (more trailing 0's than adding)
+    - ends with 11: add (more trailing 0's than subtracting), except for 3 itself
+And adding 1 to ...11 only leaves a carry moving up to the next bit. 
+So we can read the bits once from the low end and keep just the carry in a small automaton:
+    CARRY_0: nothing pending
+    CARRY_1: a 1 was carried into the current bit
+    ODD: the current bit is 1 (after the carry), we need the next bit to decide
+
+    state      next bit    operations   new state
+    CARRY_0    0           1 (halve)    CARRY_0
+    CARRY_0    1           0            ODD
+    CARRY_1    0           0            ODD          (0 + carry = 1)
+    CARRY_1    1           1 (halve)    CARRY_1      (1 + carry = 10)
+    ODD        0           3 (-1, halve, halve)      CARRY_0   (...01)
+    ODD        1           3 (+1, halve, halve)      CARRY_1   (...11)
+
+The number is at least 4 as long as there are 2 or more bits above the current one, 
+so the special case of 3 only comes up in the last two bits. We finish those off with answer().
+
+Bits come in a byte at a time: TRANSITIONS has the state and operation count after each 
+of the 256 bytes from each state, so the loop runs once per byte rather than once per bit.
+'''
+
+CARRY_0, CARRY_1, ODD = 0, 1, 2
+
+def step_bit(state, bit):
+    # One row of the table above: returns (new state, # of operations)
+    if state == CARRY_0:
+        return (CARRY_0, 1) if bit == 0 else (ODD, 0)
+    elif state == CARRY_1:
+        return (ODD, 0) if bit == 0 else (CARRY_1, 1)
+    else:
+        return (CARRY_0, 3) if bit == 0 else (CARRY_1, 3)
+
+def build_transitions():
+    # TRANSITIONS[state][byte] = (state after the 8 bits of byte, lowest bit first, # of operations)
+    transitions = []
+    for state in (CARRY_0, CARRY_1, ODD):
+        row = []
+        for byte in range(256):
+            current, operations = state, 0
+            for i in range(8):
+                current, ops = step_bit(current, (byte >> i) & 1)
+                operations += ops
+            row.append((current, operations))
+        transitions.append(row)
+    return transitions
+
+TRANSITIONS = build_transitions()
+
+def run_bits(data, bit_count, state=CARRY_0):
+    '''
+    Feed the lowest bit_count bits of data (little-endian bytes) to the automaton
+    Returns (state, # of operations)
+    '''
+    counter = 0
+    full_bytes = bit_count // 8
+    view = memoryview(data)
+    for byte in view[:full_bytes]:
+        state, operations = TRANSITIONS[state][byte]
+        counter += operations
+    for i in range(full_bytes * 8, bit_count):
+        state, operations = step_bit(state, (view[i // 8] >> (i % 8)) & 1)
+        counter += operations
+    return state, counter
+
+def finish(state, top):
+    '''
+    Operations left once only the top two bits (top) are unread
+    '''
+    if state == ODD:
+        # The current bit is 1 and the number is at least 5
+        return answer(top * 2 + 1)
+    return answer(top + state)
+
+def get_bits(n, byteorder=None):
+    '''
+    Returns (little-endian bytes of n, bit length of n)
+    n is read like answer() reads it. Bytes in binary (with a byteorder) are used as they are, 
+    without building the int.
+    '''
+    if is_bytes(n) and byteorder is not None:
+        data = bytes(n) if byteorder == 'little' else bytes(n)[::-1]
+        # Leading zero bytes sit at the end in little-endian
+        data = data.rstrip(b'\0')
+        bit_length = (len(data) - 1) * 8 + data[-1].bit_length() if data else 0
+    else:
+        n = to_int(n)
+        bit_length = n.bit_length()
+        data = n.to_bytes((bit_length + 7) // 8, 'little')
+    return data, bit_length
+
+def top_bits(data, bit_length):
+    # The two highest bits of the number
+    return 2 | ((data[(bit_length - 2) // 8] >> ((bit_length - 2) % 8)) & 1)
+
+def answer_bits(n, byteorder=None):
+    '''
+    Same as answer(n, byteorder), in one pass over the bits of n.
+    '''
+    data, bit_length = get_bits(n, byteorder)
+    if bit_length <= 2:
+        return answer(int.from_bytes(data, 'little'))
+
+    state, counter = run_bits(data, bit_length - 2)
+    return counter + finish(state, top_bits(data, bit_length))
+
+'''
+Splitting the bits
+
+The automaton only passes its state from one bit to the next. So a chunk of bits can be 
+summed up without knowing what came before it: for each of the 3 states it could start in, 
+which state it ends in and how many operations it adds. 
+Two summaries next to each other compose into the summary of both chunks, and that composition is associative. 
+So chunks can be summarized in any order, on any number of processes, and folded together at the end.
+
+Running the chunk once per start state would triple the work. Instead, the three runs go together,
+a byte at a time, through TRIPLE_TRANSITIONS: the same table as TRANSITIONS, over the triple of states
+reached from CARRY_0, CARRY_1 and ODD. The runs merge quickly: 00 sends every state to CARRY_0, and 11 to CARRY_1.
+From then on they only differ by their counts so far, and the rest of the chunk is a single run_bits().
+'''
+
+IDENTITY = ((CARRY_0, 0), (CARRY_1, 0), (ODD, 0))
+
+def build_triple_transitions():
+    # TRIPLE_TRANSITIONS[code][byte] = (new code, # of operations from each of the 3 start states),
+    # where code = 9 * s0 + 3 * s1 + s2 for the states s0, s1, s2 reached from CARRY_0, CARRY_1 and ODD
+    transitions = []
+    for code in range(27):
+        states = (code // 9, code // 3 % 3, code % 3)
+        row = []
+        for byte in range(256):
+            moved = [ TRANSITIONS[state][byte] for state in states ]
+            row.append((9 * moved[0][0] + 3 * moved[1][0] + moved[2][0], moved[0][1], moved[1][1], moved[2][1]))
+        transitions.append(row)
+    return transitions
+
+TRIPLE_TRANSITIONS = build_triple_transitions()
+
+# The codes where all three runs are in the same state
+MERGED = { 13 * state: state for state in (CARRY_0, CARRY_1, ODD) }
+
+def summarize_chunk(chunk):
+    # (state, # of operations) after the chunk, for each state it can start in
+    view = memoryview(chunk)
+    code = 9 * CARRY_0 + 3 * CARRY_1 + ODD
+    from_0 = from_1 = from_odd = 0
+    for position, byte in enumerate(view):
+        code, operations_0, operations_1, operations_odd = TRIPLE_TRANSITIONS[code][byte]
+        from_0 += operations_0
+        from_1 += operations_1
+        from_odd += operations_odd
+        if code in MERGED:
+            rest = view[position + 1:]
+            state, operations = run_bits(rest, len(rest) * 8, MERGED[code])
+            return ((state, from_0 + operations), (state, from_1 + operations), (state, from_odd + operations))
+    # Only alternating bits never merge
+    return ((code // 9, from_0), (code // 3 % 3, from_1), (code % 3, from_odd))
+
+def compose(low, high):
+    # Summary of chunk low followed by chunk high
+    return tuple((high[state][0], operations + high[state][1]) for state, operations in low)
+
+def answer_parallel(n, workers=None, chunk_bytes=1 << 20, byteorder=None):
+    '''
+    Same as answer(n, byteorder), with chunks of chunk_bytes bytes summarized on a process pool
+
+    The summaries are folded with a plain reduce() here rather than a parallel prefix: there is one per chunk,
+    and composing two is a few additions, so the fold is nothing next to summarizing the chunks.
+    '''
+    from concurrent.futures import ProcessPoolExecutor
+
+    data, bit_length = get_bits(n, byteorder)
+    if bit_length <= 2:
+        return answer(int.from_bytes(data, 'little'))
+
+    full_bytes = (bit_length - 2) // 8
+    chunks = [ data[i:min(i + chunk_bytes, full_bytes)] for i in range(0, full_bytes, chunk_bytes) ]
+    with ProcessPoolExecutor(workers) as pool:
+        summary = reduce(compose, pool.map(summarize_chunk, chunks), IDENTITY)
+
+    # The bits left over between the last full byte and the top two bits
+    state, counter = summary[CARRY_0]
+    state, operations = run_bits(data[full_bytes:], bit_length - 2 - full_bytes * 8, state)
+    return counter + operations + finish(state, top_bits(data, bit_length))
+
+'''
+The operations themselves
+
+The same walk over the bits can say which operations to do, not just how many. 
+Every step of the automaton maps to a few operations:
+    CARRY_0 + 0, CARRY_1 + 1: halve
+    ODD + 0: remove one, halve, halve
+    ODD + 1: add one, halve, halve
+Long runs of halving are common, so the generator yields run-length encoded (operation, times) 
+pairs, e.g. ('halve', 37), and only keeps the current run. No intermediate number is ever built.
+PelletSolver.path() below yields its operations in the same format, with 'divide_by_3' and so on for its divisors.
+'''
+
+def run_lengths(sequence):
+    # Merge the (operation, times) pairs of the same operation next to each other
+    current, total = None, 0
+    for operation, times in sequence:
+        if operation == current:
+            total += times
+            continue
+        if current is not None:
+            yield current, total
+        current, total = operation, times
+    if current is not None:
+        yield current, total
+
+def small_operations(n):
+    # The operations of answer() for a small n, one at a time
+    while n > 3:
+        if n % 2 == 0:
+            n >>= 1
+            yield 'halve'
+        elif n % 4 == 1:
+            n -= 1
+            yield 'remove'
+        else:
+            n += 1
+            yield 'add'
+    if n == 3:
+        yield 'remove'
+        n = 2
+    if n == 2:
+        yield 'halve'
+
+def bit_operations(data, bit_length):
+    # The operations of answer() one at a time, from the bits of the number
+    state = CARRY_0
+    for i in range(bit_length - 2):
+        bit = (data[i // 8] >> (i % 8)) & 1
+        if state == ODD:
+            yield 'remove' if bit == 0 else 'add'
+            yield 'halve'
+            yield 'halve'
+        elif (state == CARRY_0 and bit == 0) or (state == CARRY_1 and bit == 1):
+            yield 'halve'
+        state = step_bit(state, bit)[0]
+
+    top = top_bits(data, bit_length)
+    for operation in small_operations(top * 2 + 1 if state == ODD else top + state):
+        yield operation
+
+def operations(n, byteorder=None):
+    '''
+    Yield the operations that bring n down to 1 as (operation, times) pairs, 
+    where operation is 'add', 'remove' or 'halve'. 
+    The times add up to answer(n).
+    '''
+    data, bit_length = get_bits(n, byteorder)
+    if bit_length == 0:
+        raise ValueError('n must be positive')
+
+    if bit_length <= 2:
+        sequence = small_operations(int.from_bytes(data, 'little'))
+    else:
+        sequence = bit_operations(data, bit_length)
+
+    for run in run_lengths((operation, 1) for operation in sequence):
+        yield run
+
+def answer_file(path):
+    '''
+    answer() for every number in a file, one per line, 
+    read through a memory map and parsed in subquadratic time
+    '''
+    for n in iter_numbers(path):
+        yield answer_bits(n)
+
+'''
+Other operations
+
+Newer intakes can also divide by 3 (or 5, ...) when the count is a multiple, and every operation has its own cost. 
+The trailing zeros trick only works for halving, so we go back to a search. 
+From n, dividing by d is only worth it from the nearest multiples of d:
+    remove n % d pellets, divide, and continue from n // d
+    add d - n % d pellets, divide, and continue from n // d + 1
+Going further to another multiple costs d adds (or removes) before the division, 
+where 1 add (or remove) after the division gets to the same place. 
+And there's always the option of removing pellets one by one down to 1.
+
+So the best cost of n only depends on the best costs of a couple of numbers around n / d for each d,
+which gives O(log(n)^k) different numbers for k divisors. 
+
+All of them are n // D or n // D + 1 for a product D of divisors: (n // D + 1) // d + 1 only comes up when 
+n // D + 1 isn't a multiple of d, and then it's n // (D*d) + 1 again. 
+So instead of searching down from n, we go up: D from the largest product <= n down to 1, 
+solving n // D and n // D + 1 each time. Their next numbers come from a bigger D, so they are already solved.
+And once we are at D, no number below n // (D * max divisor) is needed anymore, so only a window of 
+O(log(n)^(k-1)) numbers is kept in memory, whatever the cache size. 
+The products D come out in decreasing order from a heap holding, for every product of the other divisors, 
+the largest power of the smallest divisor that still fits.
+
+Solved numbers also go in an LRU cache, so later calls with nearby numbers reuse them.
+cache_info() keeps the two apart so the cache can be sized: hits are the numbers found in the LRU cache, 
+working_hits the reuses inside the window of a single call, and working_peak is the biggest the window got.
+'''
+
+class PelletSolver(object):
+    '''
+    Minimum cost to bring n pellets down to 1 with 
+    add one (add_cost), remove one (remove_cost) and divide by d (divisors[d]) operations
+    '''
+
+    def __init__(self, add_cost=1, remove_cost=1, divisors=None, cache_size=100000):
+        if divisors is None:
+            divisors = {2: 1}
+        if add_cost <= 0 or remove_cost <= 0 or any(cost <= 0 for cost in divisors.values()):
+            raise ValueError('Costs must be positive')
+        if any(d < 2 for d in divisors):
+            raise ValueError('Divisors must be at least 2')
+
+        self.add_cost = add_cost
+        self.remove_cost = remove_cost
+        self.divisors = dict(divisors)
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.working_hits = 0
+        self.working_peak = 0
+
+        # The original operations, where answer_bits() is exact and much faster
+        self.classic = add_cost == 1 and remove_cost == 1 and self.divisors == {2: 1}
+
+    def cache_info(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self.cache),
+            'max_size': self.cache_size,
+            'working_hits': self.working_hits,
+            'working_peak': self.working_peak,
+        }
+
+    def choices(self, n):
+        # (cost before moving on, operations, next n) for every way to continue from n > 1
+        yield (n - 1) * self.remove_cost, [('remove', n - 1)], 1
+        for d, cost in self.divisors.items():
+            r = n % d
+            if n - r >= d:
+                operations = [('remove', r)] if r else []
+                yield r * self.remove_cost + cost, operations + [('divide_by_%d' % d, 1)], n // d
+            if r:
+                yield (d - r) * self.add_cost + cost, [('add', d - r), ('divide_by_%d' % d, 1)], n // d + 1
+
+    def lookup(self, n):
+        if n == 1:
+            return 0
+        if n in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(n)
+            return self.cache[n]
+        return None
+
+    def store(self, n, value):
+        self.misses += 1
+        self.cache[n] = value
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+
+    def products(self, n):
+        '''
+        Yield every product of divisors <= n once, from the largest down to 1
+        '''
+        divisors = sorted(self.divisors)
+        smallest = divisors[0]
+        others = [1]
+        for d in divisors[1:]:
+            grown = []
+            for p in others:
+                while p <= n:
+                    grown.append(p)
+                    p *= d
+            others = grown
+
+        heap = []
+        for p in others:
+            D = p
+            while D * smallest <= n:
+                D *= smallest
+            heap.append((-D, p))
+        heapq.heapify(heap)
+
+        last = None
+        while heap:
+            D, p = heap[0]
+            D = -D
+            if D > p:
+                heapq.heapreplace(heap, (-(D // smallest), p))
+            else:
+                heapq.heappop(heap)
+            # Divisors like 2 and 4 give the same product more than once
+            if D != last:
+                yield D
+                last = D
+
+    def solve(self, x, working):
+        # x > 1, with all its next numbers in working
+        best = None
+        for before, operations, next_n in self.choices(x):
+            if next_n == 1:
+                after = 0
+            else:
+                after = working[next_n]
+                self.working_hits += 1
+            if best is None or before + after < best:
+                best = before + after
+        self.store(x, best)
+        return best
+
+    def cost(self, n):
+        result = self.lookup(n)
+        if result is not None:
+            return result
+
+        largest = max(self.divisors)
+        working = {1: 0}
+        # Numbers in working, smallest first, to drop them when they can't be needed anymore
+        window = []
+        for D in self.products(n):
+            needed = n // (D * largest)
+            while window and window[0] < needed:
+                del working[heapq.heappop(window)]
+
+            x = n // D
+            for x in ((x, x + 1) if D > 1 else (x,)):
+                if x in working:
+                    continue
+                value = self.lookup(x)
+                if value is None:
+                    value = self.solve(x, working)
+                working[x] = value
+                heapq.heappush(window, x)
+            self.working_peak = max(self.working_peak, len(working))
+
+        return working[n]
+
+    def answer(self, n):
+        n = to_int(n)
+        if n < 1:
+            raise ValueError('n must be positive')
+        if self.classic:
+            return answer_bits(n)
+        return self.cost(n)
+
+    def path(self, n):
+        '''
+        Yield a cheapest way from n to 1, as run-length (operation, times) pairs like operations()
+        '''
+        return run_lengths(self.steps(to_int(n)))
+
+    def steps(self, n):
+        # The operations of path(), one choice at a time
+        while n > 1:
+            best = None
+            for before, operations, next_n in self.choices(n):
+                total = before + self.cost(next_n)
+                if best is None or total < best[0]:
+                    best = (total, operations, next_n)
+            for operation in best[1]:
+                yield operation
+            n = best[2]
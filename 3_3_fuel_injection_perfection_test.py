@@ -0,0 +1,166 @@
+'''
+Checks for 3_3_fuel_injection_perfection.py, against a shortest path search over the pellet counts.
+'''
+
+import heapq
+from fractions import Fraction
+import random
+
+from challenge_loader import load
+
+fuel = load('3_3_fuel_injection_perfection')
+
+def shortest_path(n, add_cost=1, remove_cost=1, divisors=None):
+    '''
+    Dijkstra from n down to 1. Going above 2n + the biggest divisor is never worth it.
+    '''
+    if divisors is None:
+        divisors = {2: 1}
+    limit = 2 * n + max(divisors)
+    best = {n: 0}
+    heap = [(0, n)]
+    while heap:
+        cost, x = heapq.heappop(heap)
+        if x == 1:
+            return cost
+        if cost > best[x]:
+            continue
+        moves = [(x + 1, add_cost), (x - 1, remove_cost)]
+        moves += [ (x // d, c) for d, c in divisors.items() if x % d == 0 ]
+        for y, c in moves:
+            if 1 <= y <= limit and cost + c < best.get(y, cost + c + 1):
+                best[y] = cost + c
+                heapq.heappush(heap, (cost + c, y))
+
+def test_answer():
+    assert fuel.answer('4') == 2
+    assert fuel.answer('15') == 5
+    for n in range(1, 600):
+        assert fuel.answer(n) == shortest_path(n)
+
+def test_bit_engines():
+    rng = random.Random(3)
+    numbers = list(range(1, 300)) + [ rng.getrandbits(rng.randint(3, 3000)) | 1 for _ in range(50) ]
+    for n in numbers:
+        expected = fuel.answer(n)
+        assert fuel.answer_bits(n) == expected
+        assert sum(times for operation, times in fuel.operations(n)) == expected
+    big = rng.getrandbits(100000)
+    assert fuel.answer_parallel(big, workers=2, chunk_bytes=1000) == fuel.answer(big)
+
+def test_summarize_chunk():
+    # One pass over the chunk, against a run from each start state
+    rng = random.Random(5)
+    chunks = [b'', b'\x55' * 40, b'\xaa' * 40, b'\x55' * 20 + b'\x0f' + b'\xaa' * 3]
+    chunks += [ bytes(rng.choice([rng.randrange(256), 0x55, 0xaa]) for _ in range(rng.randint(1, 40))) for _ in range(500) ]
+    for chunk in chunks:
+        expected = tuple(fuel.run_bits(chunk, len(chunk) * 8, state) for state in (fuel.CARRY_0, fuel.CARRY_1, fuel.ODD))
+        assert fuel.summarize_chunk(chunk) == expected
+    n = int.from_bytes(b'\x55' * 3000, 'little')
+    assert fuel.answer_parallel(n, workers=1, chunk_bytes=700) == fuel.answer(n)
+
+def test_bytes():
+    # Bytes are text, unless a byteorder says they are binary, and every engine agrees
+    assert fuel.answer(b'15') == fuel.answer_bits(b'15') == fuel.answer('15') == 5
+    assert fuel.answer(b'0x1f') == fuel.answer_bits(b'0x1f') == fuel.answer(31)
+    n = random.Random(4).getrandbits(5000)
+    for byteorder in ('big', 'little'):
+        data = n.to_bytes(700, byteorder)
+        assert fuel.answer(data, byteorder) == fuel.answer_bits(data, byteorder) == fuel.answer(n)
+        assert fuel.answer_parallel(data, workers=1, chunk_bytes=64, byteorder=byteorder) == fuel.answer(n)
+        assert sum(times for _, times in fuel.operations(data, byteorder)) == fuel.answer(n)
+
+def test_number_types():
+    # Anything int() took before still works, as long as it's a whole number
+    assert fuel.answer(4.0) == fuel.answer(Fraction(4)) == 2
+    try:
+        import numpy as np
+        assert fuel.answer(np.int64(15)) == fuel.answer(np.uint8(15)) == 5
+    except ImportError:
+        pass
+    for bad in (4.5, Fraction(9, 2)):
+        try:
+            fuel.answer(bad)
+            assert False, bad
+        except ValueError:
+            pass
+
+def test_pellet_solver():
+    rng = random.Random(0)
+    settings = [
+        (1, 1, {2: 1}),
+        (2, 1, {2: 1, 3: 2}),
+        (1, 3, {3: 1, 5: 2}),
+        (1, 1, {2: 1, 4: 1}),
+        (2, 2, {2: 3, 3: 3, 5: 4}),
+    ]
+    for add_cost, remove_cost, divisors in settings:
+        # A tiny cache gives the same costs, it only solves more
+        for cache_size in (2, 100000):
+            solver = fuel.PelletSolver(add_cost, remove_cost, divisors, cache_size=cache_size)
+            for n in list(range(2, 200)) + [ rng.randint(200, 3000) for _ in range(20) ]:
+                expected = shortest_path(n, add_cost, remove_cost, divisors)
+                assert solver.cost(n) == expected
+            assert len(solver.cache) <= cache_size
+
+def test_pellet_path():
+    divisors = {2: 1, 3: 2, 5: 3}
+    solver = fuel.PelletSolver(2, 1, divisors, cache_size=1000)
+    n = random.Random(1).getrandbits(40)
+    x = n
+    cost = 0
+    path = list(solver.path(n))
+    for operation, times in path:
+        if operation == 'add':
+            x += times
+            cost += 2 * times
+        elif operation == 'remove':
+            x -= times
+            cost += times
+        else:
+            d = int(operation[len('divide_by_'):])
+            assert operation == 'divide_by_%d' % d
+            for _ in range(times):
+                assert x % d == 0
+                x //= d
+                cost += divisors[d]
+    assert x == 1
+    assert cost == solver.cost(n)
+    # Runs are merged like in operations()
+    assert all(path[i][0] != path[i + 1][0] for i in range(len(path) - 1))
+    assert any(times > 1 for operation, times in path if operation.startswith('divide_by_'))
+
+def test_pellet_cache_info():
+    # Reuse inside a single call isn't a cache hit, and the working set stays far below the # of numbers solved
+    n = random.Random(2).getrandbits(60)
+    solver = fuel.PelletSolver(1, 1, {2: 1, 3: 1, 5: 1}, cache_size=1000)
+    solver.cost(n)
+    info = solver.cache_info()
+    assert info['hits'] == 0
+    assert info['working_hits'] > info['misses'] > info['max_size']
+    assert info['size'] == info['max_size']
+    assert info['working_peak'] < info['misses'] // 4
+
+    # A cache that is too small for the numbers around n thrashes: hardly anything is found again
+    misses = info['misses']
+    solver.cost(n + 1)
+    info = solver.cache_info()
+    assert info['hits'] < (info['misses'] - misses) // 10
+
+    # A big enough cache finds most of them
+    solver = fuel.PelletSolver(1, 1, {2: 1, 3: 1, 5: 1}, cache_size=10 ** 6)
+    solver.cost(n)
+    misses = solver.cache_info()['misses']
+    solver.cost(n + 1)
+    info = solver.cache_info()
+    assert info['hits'] > 0 and info['misses'] - misses < misses // 10
+
+if __name__ == '__main__':
+    test_answer()
+    test_bit_engines()
+    test_summarize_chunk()
+    test_bytes()
+    test_number_types()
+    test_pellet_solver()
+    test_pellet_path()
+    test_pellet_cache_info()
@@ -59,8 +59,10 @@ First id of each row always increases by n
 But a naive approach like the one below is going to cause memory error since we could be dealing with billions of int in a list...
 '''
 
-from functools import reduce
-import operator
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 """
 # Naive brute force; store ranges
@@ -98,7 +100,9 @@ So we just need to find out:
         - ( if last exists after pairing numbers after the first num )
 '''
 
+"""
 # Smarter approach?
+# Still builds a list with a few numbers per row
 def answer(start, length):
     ids = []
     
@@ -152,3 +156,119 @@ def answer(start, length):
         start += length
 
     return reduce(operator.xor, ids, 0)
+"""
+
+# Prefix XOR
+'''
+The pairing trick above is a special case of a more general one. 
+XOR of every number from 0 to n only depends on n % 4:
+    n % 4 == 0 -> n         e.g. 0^1^2^3^4 = 4
+    n % 4 == 1 -> 1         e.g. 0^1^2^3^4^5 = 1
+    n % 4 == 2 -> n + 1     e.g. 0^1^2^3^4^5^6 = 7
+    n % 4 == 3 -> 0         e.g. 0^1^2^3 = 0
+since every group of 4 starting at a multiple of 4 XORs to 0.
+
+So XOR of a..b = xor_upto(b) ^ xor_upto(a-1), and each row costs O(1) without any list.
+'''
+
+def xor_upto(n):
+    # XOR of 0..n, and 0 for n == -1
+    return [n, 1, n + 1, 0][n % 4]
+
+def answer(start, length):
+    checksum = 0
+    for row_num in range(length):
+        row_start = start + row_num * length
+        num_of_elements_to_take = length - row_num
+        checksum ^= xor_upto(row_start + num_of_elements_to_take - 1) ^ xor_upto(row_start - 1)
+    return checksum
+
+def xor_upto_array(n):
+    # xor_upto() on a uint64 array. n - 1 wraps around for n == 0, and 2^64 - 1 gives 0 as well
+    r = n & np.uint64(3)
+    return np.where(r == 0, n, np.where(r == 1, np.uint64(1), np.where(r == 2, n + np.uint64(1), np.uint64(0))))
+
+def answer_many(starts, lengths, block=1 << 18):
+    '''
+    answer() for every pair of starts and lengths at once, as a uint64 array of the same shape.
+
+    Moving all the checkpoints forward one row at a time would cost max(lengths) passes over every checkpoint,
+    even the ones that finished long ago. Instead, the rows of all the checkpoints are laid end to end
+    and handled in blocks of about block rows: each row finds its checkpoint with a binary search on the row offsets,
+    gets its checksum from xor_upto_array(), and the checksums of a checkpoint are XORed together with reduceat.
+    That's O(sum(lengths)) work, like the scalar loop, but without any Python per row,
+    and a single very long checkpoint is just split over several blocks.
+    '''
+    if np is None:
+        raise ImportError('answer_many() needs NumPy')
+
+    starts = np.asarray(starts, dtype=np.uint64)
+    lengths = np.asarray(lengths, dtype=np.uint64)
+    if starts.shape != lengths.shape:
+        raise ValueError('starts and lengths must have the same shape')
+    shape = starts.shape
+    starts = starts.ravel()
+    lengths = lengths.ravel()
+    checksums = np.zeros(starts.shape, dtype=np.uint64)
+
+    # The rows of checkpoint i are offsets[i] to offsets[i + 1] - 1
+    offsets = np.zeros(len(lengths) + 1, dtype=np.uint64)
+    np.cumsum(lengths, out=offsets[1:])
+    total = int(offsets[-1])
+
+    one = np.uint64(1)
+    for low in range(0, total, block):
+        rows = np.arange(low, min(low + block, total), dtype=np.uint64)
+        owner = np.searchsorted(offsets, rows, side='right') - 1
+        row_num = rows - offsets[owner]
+        length = lengths[owner]
+        row_start = starts[owner] + row_num * length
+        last = row_start + (length - row_num) - one
+        row_checksums = xor_upto_array(last) ^ xor_upto_array(row_start - one)
+
+        # owner is sorted, so every checkpoint in the block is one run
+        first = np.flatnonzero(np.concatenate(([True], owner[1:] != owner[:-1])))
+        checksums[owner[first]] ^= np.bitwise_xor.reduceat(row_checksums, first)
+
+    return checksums.reshape(shape)
+
+# Any skip schedule
+'''
+Nothing above really depends on the guards skipping one more worker per row. 
+A row is just a first ID and a number of workers to take, and its checksum is two xor_upto() calls.
+So any schedule works: rows of different widths, gaps between IDs, a different count per row.
+
+checksum_rows() streams over the rows and never holds more than one of them, 
+so a schedule with billions of rows runs in constant memory. 
+It yields (row_num, row checksum, running checksum), and can pick up where it left off 
+given state=(next row_num, running checksum) from a previous run.
+'''
+
+def guard_schedule(start, length):
+    # The guards' schedule from the problem statement, as (row_start, take_count) pairs
+    for row_num in range(length):
+        yield start + row_num * length, length - row_num
+
+def checksum_rows(schedule, state=None):
+    '''
+    schedule is either an iterable of (row_start, take_count) pairs, 
+    or a function taking the row number and returning (row_start, take_count), or None after the last row.
+    When resuming from state, an iterable should continue right after the rows already seen.
+    '''
+    row_num, running = state if state is not None else (0, 0)
+
+    if callable(schedule):
+        def rows(get_row, row_num):
+            while True:
+                row = get_row(row_num)
+                if row is None:
+                    return
+                yield row
+                row_num += 1
+        schedule = rows(schedule, row_num)
+
+    for row_start, take_count in schedule:
+        row_checksum = xor_upto(row_start + take_count - 1) ^ xor_upto(row_start - 1)
+        running ^= row_checksum
+        yield row_num, row_checksum, running
+        row_num += 1
@@ -0,0 +1,75 @@
+'''
+Checks for 3_4_queue_to_do.py, against the brute force answer.
+Run with pytest, or as a script to also time answer_many() against a loop over answer().
+'''
+
+from functools import reduce
+import operator
+import random
+import time
+
+from challenge_loader import load, skip_without_numpy
+
+queue = load('3_4_queue_to_do')
+
+def brute_force(start, length):
+    checksum = 0
+    for row_num in range(length):
+        row_start = start + row_num * length
+        checksum ^= reduce(operator.xor, range(row_start, row_start + length - row_num), 0)
+    return checksum
+
+def test_answer():
+    assert queue.answer(0, 3) == 2
+    assert queue.answer(17, 4) == 14
+    for start in range(40):
+        for length in range(12):
+            assert queue.answer(start, length) == brute_force(start, length)
+
+def test_answer_many():
+    skip_without_numpy(queue)
+    rng = random.Random(1)
+    starts = [ rng.randint(0, 2000000000) for _ in range(500) ]
+    lengths = [ rng.choice([0, 1, 2, rng.randint(0, 300)]) for _ in range(500) ]
+    expected = [ queue.answer(s, l) for s, l in zip(starts, lengths) ]
+    # Small blocks so checkpoints get split between blocks
+    for block in (7, 1000, 1 << 18):
+        assert queue.answer_many(starts, lengths, block=block).tolist() == expected
+
+    grid = queue.answer_many(queue.np.array(starts).reshape(20, 25), queue.np.array(lengths).reshape(20, 25))
+    assert grid.shape == (20, 25)
+    assert grid.ravel().tolist() == expected
+    assert queue.answer_many([], []).tolist() == []
+
+def test_checksum_rows():
+    rows = list(queue.checksum_rows(queue.guard_schedule(17, 4)))
+    assert rows[-1][2] == 14
+    schedule = list(queue.guard_schedule(17, 4))
+    row_num, _, running = rows[1]
+    resumed = list(queue.checksum_rows(schedule[2:], state=(row_num + 1, running)))
+    assert resumed == rows[2:]
+
+def benchmark(count=1000000, long_length=2000):
+    # Mostly short checkpoints and a long one, the worst case of the old row by row version
+    rng = random.Random(2)
+    starts = [ rng.randint(0, 2000000000) for _ in range(count) ]
+    lengths = [ rng.randint(0, 3) for _ in range(count) ]
+    lengths[0] = long_length
+
+    started = time.time()
+    expected = [ queue.answer(s, l) for s, l in zip(starts, lengths) ]
+    scalar = time.time() - started
+
+    started = time.time()
+    checksums = queue.answer_many(starts, lengths)
+    vectorized = time.time() - started
+
+    assert checksums.tolist() == expected
+    print('answer() loop: %.2fs, answer_many(): %.2fs' % (scalar, vectorized))
+
+if __name__ == '__main__':
+    test_answer()
+    test_checksum_rows()
+    if queue.np is not None:
+        test_answer_many()
+        benchmark()
@@ -0,0 +1,26 @@
+'''
+The challenge files start with a digit, so the tests can't import them with an import statement.
+'''
+
+import importlib
+import os
+import sys
+import unittest
+
+def load(name):
+    '''
+    Import the challenge file name.py next to this one.
+    It is imported as a regular module, so its functions can be pickled for the process pools.
+    '''
+    here = os.path.dirname(os.path.abspath(__file__))
+    if here not in sys.path:
+        sys.path.insert(0, here)
+    return importlib.import_module(name)
+
+def skip_without_numpy(module):
+    '''
+    Skip the calling test when the module runs without NumPy, so it shows up as skipped rather than passed.
+    pytest understands unittest.SkipTest too, so the tests don't have to import pytest.
+    '''
+    if module.np is None:
+        raise unittest.SkipTest('NumPy is not installed')
@@ -42,54 +42,73 @@ Case #4: 99999999999999999
 Note that the last sample case would not appear in the Small dataset.
 '''
 
-def all_9_digit (length):
-    return 10**(length) - 1
+import sys
 
-def last_tidy_num (N):
-    if N <= 9:
-        return str(N)
-    
-    N = str(N)
+'''
+The largest tidy number <= N only differs from N after the first descent, i.e. the first digit bigger than the next one.
+Everything before it is kept, except that a digit has to be lowered by 1 to make room for 9's after it.
+Lowering the digit right before the descent could break the order with the digits before it, 
+but only if they are equal to it, so the digit to lower is the first of that run of equal digits:
+    132 -> the descent is at 3, lower it: 129
+    1332 -> the run of 3's starts at index 1: 1299
+    1110 -> the run of 1's starts at 0, lower it to 0 and drop it: 999
+Finding the descent is one pass to the right, the run of equal digits one pass back, 
+so it's linear in the number of digits, and N can have millions of them.
+'''
 
-    zero_index = N.find('0')
-    if zero_index != -1:
-        # Not tidy num for sure
-        if zero_index == 1 and N[0] == 1:
-            # e.g. 1099 -> 999
-            return last_tidy_num(all_9_digit(len(N)-1))
-        else:
-            # e.g. 2209 -> 2199 -> 1999
-            return last_tidy_num(
-                    int(N[:zero_index-1] + \
-                            str(int(N[zero_index-1]) - 1) + \
-                            str(all_9_digit(len(N)-zero_index))))
-
-    # Check if first digit is greater than the 2nd one
-    if int(N[0]) > int(N[1]):
-        # e.g. 987, 212
-        # Subtract the first digit by 1, and change the rest to 9
-        # cases like 100, 110 are handled above
-            return str(int(N[0])-1) + str(all_9_digit(len(N)-1))
-    else:
-        # e.g. 123, 121, 110
-        return N[0] + str(last_tidy_num(int(N[1:])))
+NINE = ord('9')
 
-def is_tidy_num(N):
-    if int(N) <= 9:
-        return True
+def tidy_digits (digits):
+    '''
+    The largest tidy number <= N, with N and the result as ASCII digits (bytes or bytearray)
+    '''
+    digits = bytearray(digits.strip())
+
+    # 1) First descent
+    descent = 0
+    while descent < len(digits) - 1 and digits[descent] <= digits[descent + 1]:
+        descent += 1
+    if descent >= len(digits) - 1:
+        return bytes(digits)
+
+    # 2) Back to the first digit of the run
+    lowered = descent
+    while lowered > 0 and digits[lowered - 1] == digits[lowered]:
+        lowered -= 1
 
+    # 3) Lower it, 9's after it
+    digits[lowered] -= 1
+    digits[lowered + 1:] = bytes([NINE]) * (len(digits) - lowered - 1)
+
+    # 4) Only the first digit can become 0
+    if digits[0] == ord('0'):
+        del digits[0]
+    return bytes(digits)
+
+def last_tidy_num (N):
+    '''
+    The largest tidy number <= N, as a string for an int or a string, as bytes for bytes.
+    Huge N have to come as a string or bytes: writing an int out in decimal is quadratic, 
+    and Python 3.11+ refuses ints over 4300 digits (ValueError).
+    '''
+    if isinstance(N, int):
+        N = str(N)
+    if isinstance(N, str):
+        return tidy_digits(N.encode('ascii')).decode('ascii')
+    return tidy_digits(N)
+
+def is_tidy_num(N):
     N = str(N)
     for i in range(len(N)-1):
-        if int(N[i]) > int(N[i+1]):
+        if N[i] > N[i+1]:
             return False
     return True
 
-def last_tidy_num_wrapper(N):
-    while not is_tidy_num(N):
-        N = last_tidy_num(int(N))
-    return N
-    
-
-rows = int(input())
-for i in range(rows):
-    print('Case #' + str(i+1) + ': ' + str(last_tidy_num_wrapper(int(input()))))
+if __name__ == '__main__':
+    # Read the lines as bytes, int() would be quadratic on huge N
+    lines = sys.stdin.buffer
+    rows = int(lines.readline())
+    for i in range(rows):
+        sys.stdout.write('Case #' + str(i+1) + ': ')
+        sys.stdout.flush()
+        sys.stdout.buffer.write(tidy_digits(lines.readline()) + b'\n')
@@ -0,0 +1,35 @@
+'''
+Checks for p1.py, against scanning every number with is_tidy_num()
+'''
+
+import os
+import sys
+
+here = os.path.dirname(os.path.abspath(__file__))
+if here not in sys.path:
+    sys.path.insert(0, here)
+
+import p1
+
+LIMIT = 20000
+
+def test_last_tidy_num():
+    last = None
+    for n in range(1, LIMIT + 1):
+        if p1.is_tidy_num(str(n)):
+            last = str(n)
+        assert str(p1.last_tidy_num(n)) == last
+        assert p1.last_tidy_num(str(n)) == last
+        assert p1.last_tidy_num(str(n).encode('ascii')) == last.encode('ascii')
+
+def test_huge():
+    # A million digits, given as a string and as bytes
+    digits = '1' * 500000 + '2' * 500000 + '0'
+    expected = '1' * 500001 + '9' * 500000
+    assert p1.last_tidy_num(digits) == expected
+    assert p1.last_tidy_num(digits.encode('ascii')) == expected.encode('ascii')
+
+if __name__ == '__main__':
+    test_last_tidy_num()
+    test_huge()
+    print('OK')
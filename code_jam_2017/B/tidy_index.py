@@ -0,0 +1,171 @@
+'''
+Counting tidy numbers
+
+A tidy number can't have a 0 (it would have to come before the first digit), so the tidy numbers of length L
+are exactly the non-decreasing strings of L digits from 1 to 9.
+Such a string is only a choice of how many 1's, 2's, ..., 9's it has, so with stars and bars
+there are C(L + 8, 8) of them, and C(L + 9 - d, 9 - d) if the digits can only go from d to 9.
+Summing over the lengths (hockey stick), there are C(L + 9, 9) - 1 tidy numbers with at most L digits.
+
+With that:
+    - count_upto(N) goes through the digits of N like an odometer: at every digit, count the tidy numbers
+      that keep the digits before it and have a smaller digit there, then carry on with N's digit
+    - unrank(k) is the reverse: pick each digit by skipping whole blocks of tidy numbers until k falls in one
+    - rank(t) is count_upto(t), for a tidy t
+Every digit costs at most 9 table lookups, so these are O(digits * 10).
+
+Numbers can be given as ints, strings or bytes, and the tidy numbers come back as strings, like last_tidy_num().
+'''
+
+from p1 import is_tidy_num
+
+# BINOMIALS[n][k] = C(n, k), for k <= 9. Rows are added when a longer number comes.
+BINOMIALS = [[1] + [0] * 9]
+
+def binomial (n, k):
+    while len(BINOMIALS) <= n:
+        last = BINOMIALS[-1]
+        BINOMIALS.append([1] + [ last[j - 1] + last[j] for j in range(1, 10) ])
+    return BINOMIALS[n][k]
+
+def ways (length, low):
+    '''
+    # of non-decreasing strings of length digits, from low to 9
+    '''
+    return binomial(length + 9 - low, 9 - low)
+
+def count_shorter (length):
+    '''
+    # of tidy numbers with less than length digits
+    '''
+    return binomial(length - 1 + 9, 9) - 1 if length > 0 else 0
+
+def get_digits (N):
+    if isinstance(N, int):
+        N = str(N)
+    if isinstance(N, (bytes, bytearray)):
+        N = bytes(N).decode('ascii')
+    return N.strip()
+
+def is_positive (digits):
+    return not digits.startswith('-') and digits.lstrip('+').strip('0') != ''
+
+def compare (a, b):
+    '''
+    cmp() of two positive numbers written without leading 0's
+    '''
+    if len(a) != len(b):
+        return -1 if len(a) < len(b) else 1
+    return (a > b) - (a < b)
+
+def count_upto (N):
+    '''
+    # of tidy numbers in [1, N]
+    '''
+    digits = get_digits(N)
+    if not is_positive(digits):
+        return 0
+    digits = digits.lstrip('+0')
+
+    length = len(digits)
+    count = count_shorter(length)
+    previous = 1
+    for i, d in enumerate(digits):
+        d = int(d)
+        # Same digits before i, and c < d at i
+        for c in range(previous, d):
+            count += ways(length - i - 1, c)
+        if d < previous:
+            # N isn't tidy, and everything that keeps its digits so far is above it
+            return count
+        previous = d
+
+    # N is tidy
+    return count + 1
+
+def count_between (A, B):
+    '''
+    # of tidy numbers in [A, B]
+    '''
+    A = get_digits(A)
+    count = count_upto(B) - count_upto(A)
+    if is_positive(A) and is_tidy_num(A.lstrip('+0')):
+        count += 1
+    return max(count, 0)
+
+def rank (t):
+    '''
+    Position of the tidy number t among the tidy numbers, starting from 1
+    '''
+    digits = get_digits(t)
+    if not is_positive(digits) or not is_tidy_num(digits.lstrip('+0')):
+        raise ValueError(str(t) + ' is not a tidy number')
+    return count_upto(digits)
+
+def unrank (k):
+    '''
+    The k-th tidy number, starting from 1
+    '''
+    if k < 1:
+        raise ValueError('Tidy numbers are ranked from 1')
+
+    # 1) Length
+    length = 1
+    while count_shorter(length + 1) < k:
+        length += 1
+    k -= count_shorter(length)
+
+    # 2) Digits, from the left
+    digits = []
+    previous = 1
+    for i in range(length):
+        for c in range(previous, 10):
+            block = ways(length - i - 1, c)
+            if k <= block:
+                break
+            k -= block
+        digits.append(str(c))
+        previous = c
+    return ''.join(digits)
+
+def next_tidy (A):
+    '''
+    The smallest tidy number >= A
+    '''
+    digits = get_digits(A)
+    if not is_positive(digits):
+        return '1'
+    digits = digits.lstrip('+0')
+
+    # The first digit that breaks the order, and everything after it, are raised to the digit before
+    previous = '1'
+    for i, d in enumerate(digits):
+        if d < previous:
+            return digits[:i] + previous * (len(digits) - i)
+        previous = d
+    return digits
+
+def successor (t):
+    '''
+    The tidy number right after t, like an odometer:
+    the last digit that isn't a 9 goes up by 1, and the 9's after it become that digit
+    '''
+    i = len(t) - 1
+    while i >= 0 and t[i] == '9':
+        i -= 1
+    if i < 0:
+        return '1' * (len(t) + 1)
+    return t[:i] + str(int(t[i]) + 1) * (len(t) - i)
+
+def tidy_range (A, B):
+    '''
+    Yield the tidy numbers in [A, B], in increasing order
+    '''
+    B = get_digits(B)
+    if not is_positive(B):
+        return
+    B = B.lstrip('+0')
+    t = next_tidy(A)
+    while compare(t, B) <= 0:
+        yield t
+        t = successor(t)
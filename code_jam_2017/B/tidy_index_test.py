@@ -0,0 +1,71 @@
+'''
+Checks for tidy_index.py, against scanning every number with is_tidy_num()
+'''
+
+import os
+import random
+import sys
+
+here = os.path.dirname(os.path.abspath(__file__))
+if here not in sys.path:
+    sys.path.insert(0, here)
+
+import p1
+import tidy_index
+
+LIMIT = 20000
+TIDY = [ str(n) for n in range(1, LIMIT + 1) if p1.is_tidy_num(str(n)) ]
+
+def test_count_upto():
+    count = 0
+    for n in range(0, LIMIT + 1):
+        if n > 0 and p1.is_tidy_num(str(n)):
+            count += 1
+        assert tidy_index.count_upto(n) == count
+    assert tidy_index.count_upto('-5') == 0
+    # A sign doesn't make 0 positive
+    for zero in ('0', '+0', '+00', b'+0', '-0'):
+        assert tidy_index.count_upto(zero) == 0
+        assert tidy_index.next_tidy(zero) == '1'
+        assert list(tidy_index.tidy_range(zero, zero)) == []
+    assert tidy_index.count_upto('+007') == 7 and tidy_index.next_tidy('+0010') == '11'
+    assert tidy_index.count_upto(b'0099') == tidy_index.count_upto(99)
+
+def test_rank_unrank():
+    for k, t in enumerate(TIDY, 1):
+        assert tidy_index.rank(t) == k
+        assert tidy_index.unrank(k) == t
+    # Every length is counted: the last tidy number with L digits is 9...9
+    for length in range(1, 60):
+        assert tidy_index.unrank(tidy_index.count_shorter(length + 1)) == '9' * length
+    for bad in (0, 10, 121, '-1'):
+        try:
+            tidy_index.rank(bad)
+            assert False, bad
+        except ValueError:
+            pass
+
+def test_tidy_range():
+    rng = random.Random(6)
+    for _ in range(300):
+        a, b = sorted([ rng.randint(-10, 3000), rng.randint(-10, 3000) ])
+        expected = [ t for t in TIDY if a <= int(t) <= b ]
+        assert list(tidy_index.tidy_range(a, b)) == expected
+        assert tidy_index.count_between(a, b) == len(expected)
+
+def test_big():
+    rng = random.Random(7)
+    for _ in range(50):
+        n = rng.randint(1, 10 ** 40)
+        t = str(p1.last_tidy_num(n))
+        assert p1.is_tidy_num(t)
+        assert tidy_index.count_upto(n) == tidy_index.rank(t)
+        assert tidy_index.unrank(tidy_index.rank(t)) == t
+        assert tidy_index.next_tidy(int(t) + 1) == tidy_index.successor(t)
+
+if __name__ == '__main__':
+    test_count_upto()
+    test_rank_unrank()
+    test_tidy_range()
+    test_big()
+    print('OK')
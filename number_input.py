@@ -0,0 +1,178 @@
+'''
+Reading huge numbers
+====================
+
+Some of the challenges take their numbers as decimal strings, and int() on a decimal string
+is quadratic in its length (Python 3.11+ even refuses strings over 4300 digits by default).
+
+Divide and conquer fixes that: split the digits in two, convert each half, and glue them back with
+    int(high) * 10^len(low) + int(low)
+Always splitting off a low part of base * 2^k digits means only a handful of different powers of 10
+are ever needed, and they are computed by squaring. The cost is then dominated by the big multiplications.
+
+Hex strings and raw bytes don't need any of this, since their base is a power of 2.
+
+Writing a huge number back out has the same problem with str(), and the same fix the other way around:
+split the bits in two, which is free for a base 2 int, and glue the halves back in the decimal module
+    Decimal(high) * 2^len(low) + Decimal(low)
+whose big multiplications are fast, and whose str() is linear since it already stores decimal digits.
+
+Bytes are text everywhere, like the lines of a file: b'15' is fifteen. 
+A number stored in binary has to say so by passing its byteorder ('big' or 'little').
+'''
+
+import decimal
+import mmap
+import numbers
+
+# Short enough for int() to be fast, and below the 4300 digit limit
+BASE_DIGITS = 2000
+
+# 10^digits for digits = BASE_DIGITS * 2^k
+POWERS_OF_TEN = {}
+
+def power_of_ten(digits):
+    if digits not in POWERS_OF_TEN:
+        if digits <= BASE_DIGITS:
+            POWERS_OF_TEN[digits] = 10 ** digits
+        else:
+            half = power_of_ten(digits // 2)
+            POWERS_OF_TEN[digits] = half * half
+    return POWERS_OF_TEN[digits]
+
+def parse_decimal(digits):
+    '''
+    int() of a string (or bytes) of decimal digits, in subquadratic time
+    '''
+    if isinstance(digits, (bytes, bytearray, memoryview)):
+        digits = bytes(digits).decode('ascii')
+    digits = digits.strip()
+
+    # Checked once up front: the halves would each look fine on their own, even with a sign in the middle
+    sign = digits[:1]
+    unsigned = digits[1:] if sign in ('-', '+') else digits
+    if not (unsigned.isascii() and unsigned.isdigit()):
+        raise ValueError('invalid literal for int() with base 10: ' + repr(digits[:50]))
+
+    value = parse_digits(unsigned)
+    return -value if sign == '-' else value
+
+def parse_digits(digits):
+    # digits is only ASCII digits
+    if len(digits) <= BASE_DIGITS:
+        return int(digits)
+
+    # The low part is the biggest BASE_DIGITS * 2^k that leaves something for the high part
+    low_digits = BASE_DIGITS
+    while low_digits * 2 < len(digits):
+        low_digits *= 2
+    high = parse_digits(digits[:-low_digits])
+    low = parse_digits(digits[-low_digits:])
+    return high * power_of_ten(low_digits) + low
+
+# Short enough for str() to be fast, and below the 4300 digit limit (about 1800 digits)
+BASE_BITS = 6000
+
+# 2^bits as a Decimal, for bits = BASE_BITS * 2^k
+POWERS_OF_TWO = {}
+
+def power_of_two(bits):
+    if bits not in POWERS_OF_TWO:
+        if bits <= BASE_BITS:
+            POWERS_OF_TWO[bits] = decimal.Decimal(1 << bits)
+        else:
+            half = power_of_two(bits // 2)
+            POWERS_OF_TWO[bits] = half * half
+    return POWERS_OF_TWO[bits]
+
+def to_decimal(value):
+    # value >= 0, in a context with enough precision to be exact
+    if value.bit_length() <= BASE_BITS:
+        return decimal.Decimal(value)
+
+    # Same split as parse_decimal(), in bits
+    low_bits = BASE_BITS
+    while low_bits * 2 < value.bit_length():
+        low_bits *= 2
+    high = to_decimal(value >> low_bits)
+    low = to_decimal(value & ((1 << low_bits) - 1))
+    return high * power_of_two(low_bits) + low
+
+def format_decimal(value):
+    '''
+    str() of an int, in subquadratic time and without the 4300 digit limit
+    '''
+    value = int(value)
+    if value < 0:
+        return '-' + format_decimal(-value)
+    if value.bit_length() <= BASE_BITS:
+        return str(value)
+    with decimal.localcontext() as context:
+        context.prec = decimal.MAX_PREC
+        context.Emax = decimal.MAX_EMAX
+        context.traps[decimal.Inexact] = True
+        return str(to_decimal(value))
+
+def parse_hex(digits):
+    '''
+    int() of a hex string, with or without 0x
+    '''
+    if isinstance(digits, (bytes, bytearray, memoryview)):
+        digits = bytes(digits).decode('ascii')
+    return int(digits.strip(), 16)
+
+def parse_bytes(data, byteorder='big'):
+    '''
+    An unsigned number stored in binary
+    '''
+    return int.from_bytes(bytes(data), byteorder)
+
+def is_bytes(value):
+    return isinstance(value, (bytes, bytearray, memoryview))
+
+def to_int(value, byteorder=None):
+    '''
+    Turn whatever the challenges get as a number into an int:
+    integers (NumPy's too) are kept, and so are floats with a whole value like 4.0,
+    strings (or bytes) are decimal unless they start with 0x.
+    With a byteorder, bytes are an unsigned number in binary instead.
+    '''
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        if value != int(value):
+            raise ValueError(str(value) + ' is not a whole number')
+        return int(value)
+    if is_bytes(value):
+        if byteorder is not None:
+            return parse_bytes(value, byteorder)
+        value = bytes(value).decode('ascii')
+    value = value.strip()
+    if value[:2].lower() == '0x':
+        return parse_hex(value)
+    return parse_decimal(value)
+
+def iter_numbers(path):
+    '''
+    Yield the numbers in a file, one per line, without reading the whole file in.
+    Lines are decimal unless they start with 0x. Blank lines are skipped.
+    '''
+    with open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file
+            return
+        try:
+            start = 0
+            size = len(mapped)
+            while start < size:
+                end = mapped.find(b'\n', start)
+                if end == -1:
+                    end = size
+                line = mapped[start:end].strip()
+                if line:
+                    yield to_int(line)
+                start = end + 1
+        finally:
+            mapped.close()